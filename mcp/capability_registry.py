@@ -9,9 +9,44 @@ import json
 import os
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    # Python 3.11+ fromisoformat handles the full ISO 8601 syntax natively
+    _parse_iso_datetime = datetime.fromisoformat
+
+def _iso_to_epoch(last_tested: Optional[str]) -> float:
+    """Convert a stored ISO timestamp to epoch seconds (0.0 if missing/invalid)"""
+    if not last_tested:
+        return 0.0
+    try:
+        # Both parsers accept 'Z' suffixes and offsets; naive strings are local time
+        return _parse_iso_datetime(last_tested).timestamp()
+    except (ValueError, TypeError):
+        return 0.0
+
+def tool_last_tested_epoch(tool_info: Dict) -> float:
+    """Get a tool's last test time as epoch seconds, parsing legacy ISO entries only"""
+    last_tested_epoch = tool_info.get("last_tested_epoch")
+    if last_tested_epoch is not None:
+        return last_tested_epoch
+    return _iso_to_epoch(tool_info.get("last_tested"))
+
 class CapabilityRegistry:
     """Manages Chotu's capability registry and tool metadata"""
     
@@ -19,6 +54,8 @@ class CapabilityRegistry:
         self.registry_path = "/Users/mahendrabahubali/chotu/memory/capability_registry.json"
         self.tools_dir = "/Users/mahendrabahubali/chotu/mcp/tools"
         self.registry = self._load_registry()
+        self._stat_columns_dirty = True  # SoA stat columns are built on first get_stat_columns
+        self._register_callbacks: List[Callable[[str, int], None]] = []
         
     def _load_registry(self) -> Dict:
         """Load the capability registry"""
@@ -58,12 +95,57 @@ class CapabilityRegistry:
             }
         }
     
+    def _rebuild_stat_columns(self):
+        """Mirror the hot scan fields of every tool into parallel arrays (SoA)"""
+        self._stat_columns_dirty = False
+        
+        if not NUMPY_AVAILABLE:
+            self._success_rates = self._last_tested_epoch = self._categories = None
+            return
+        
+        tools = self.registry["tools"]
+        self._success_rates = np.array(
+            [tool.get("success_rate", 0) or 0 for tool in tools.values()], dtype=np.float64
+        )
+        self._last_tested_epoch = np.array(
+            [tool_last_tested_epoch(tool) for tool in tools.values()], dtype=np.float64
+        )
+        self._categories = np.array(
+            [str(tool.get("category")) for tool in tools.values()], dtype=object
+        )
+    
+    def get_stat_columns(self) -> Optional[Dict[str, Any]]:
+        """Get the SoA stat columns for vectorized scans (None without NumPy)"""
+        if not NUMPY_AVAILABLE:
+            return None
+        
+        # Registrations and stat updates only mark the columns stale; one rebuild per scan
+        if self._stat_columns_dirty:
+            self._rebuild_stat_columns()
+        
+        return {
+            "success_rates": self._success_rates,
+            "last_tested_epoch": self._last_tested_epoch,
+            "categories": self._categories
+        }
+    
+    def on_tool_registered(self, callback: Callable[[str, int], None]):
+        """Call callback(tool_name, tool_count) after every successful register_tool"""
+        self._register_callbacks.append(callback)
+    
     def save_registry(self):
         """Save the registry to disk"""
         try:
             self.registry["last_updated"] = datetime.now().isoformat()
-            with open(self.registry_path, 'w') as f:
-                json.dump(self.registry, f, indent=2)
+            if ORJSON_AVAILABLE:
+                with open(self.registry_path, 'wb') as f:
+                    f.write(orjson.dumps(
+                        self.registry,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                    ))
+            else:
+                with open(self.registry_path, 'w') as f:
+                    json.dump(self.registry, f, indent=2)
         except Exception as e:
             print(f"⚠️ Failed to save registry: {e}")
     
@@ -79,6 +161,7 @@ class CapabilityRegistry:
                 "auto_generated": tool_info.get("auto_generated", True),
                 "created_at": datetime.now().isoformat(),
                 "last_tested": None,
+                "last_tested_epoch": None,
                 "success_rate": 0.0,
                 "usage_count": 0,
                 "description": tool_info.get("description", ""),
@@ -86,11 +169,16 @@ class CapabilityRegistry:
             }
             
             self.registry["tools"][tool_name] = tool_entry
+            self._stat_columns_dirty = True
             self._update_category_stats(tool_entry["category"])
             self._update_system_health()
             self.save_registry()
             
             print(f"✅ Tool '{tool_name}' registered successfully")
+            
+            tool_count = len(self.registry["tools"])
+            for callback in self._register_callbacks:
+                callback(tool_name, tool_count)
             return True
             
         except Exception as e:
@@ -104,8 +192,10 @@ class CapabilityRegistry:
             return
         
         tool = self.registry["tools"][tool_name]
+        tested_at = time.time()
         tool["usage_count"] += 1
-        tool["last_tested"] = datetime.now().isoformat()
+        tool["last_tested"] = datetime.fromtimestamp(tested_at).isoformat()
+        tool["last_tested_epoch"] = tested_at
         
         # Update success rate
         current_rate = tool.get("success_rate", 0.0)
@@ -117,6 +207,7 @@ class CapabilityRegistry:
             new_rate = (current_rate * (usage_count - 1)) / usage_count
         
         tool["success_rate"] = round(new_rate, 2)
+        self._stat_columns_dirty = True
         
         # Update category stats
         self._update_category_stats(tool["category"])
@@ -1359,11 +1359,10 @@ def get_pending_tasks():
 def get_learning_log():
     """Get the learning history"""
     try:
-        with open('learning_log.json', 'r') as f:
-            log_data = json.load(f)
-        return jsonify(log_data)
-    except FileNotFoundError:
-        return jsonify({"learned_tools": [], "message": "No learning history yet"})
+        learned_tools = tool_generator.load_learning_history()
+        if not learned_tools:
+            return jsonify({"learned_tools": [], "message": "No learning history yet"})
+        return jsonify({"learned_tools": learned_tools})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
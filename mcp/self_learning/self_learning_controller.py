@@ -8,6 +8,7 @@ Main controller that orchestrates the autonomous learning process
 import os
 import sys
 import json
+import threading
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 
@@ -33,6 +34,8 @@ class SelfLearningController:
         self.sandbox = SandboxExecutor()
         
         self.learning_log = self._load_learning_log()
+        # Learning requests run on several worker threads; guards learning_log and its file
+        self._log_lock = threading.RLock()
         self.safety_mode = os.getenv('MCP_SAFE_MODE', '1') == '1'
         self.max_tools = int(os.getenv('MCP_MAX_TOOLS', '100'))
         
@@ -67,7 +70,7 @@ class SelfLearningController:
         log_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "learning_log.json")
         
         try:
-            with open(log_file, 'w') as f:
+            with self._log_lock, open(log_file, 'w') as f:
                 json.dump(self.learning_log, f, indent=2)
         except Exception as e:
             print(f"⚠️ Failed to save learning log: {e}")
@@ -87,7 +90,8 @@ class SelfLearningController:
         print(f"🎯 Handling new learning request: {intent}")
         
         # Record learning attempt
-        self.learning_log["total_attempts"] += 1
+        with self._log_lock:
+            self.learning_log["total_attempts"] += 1
         
         learning_session = {
             "timestamp": datetime.now().isoformat(),
@@ -113,8 +117,9 @@ class SelfLearningController:
             if not self.analyzer.validate_capability_gap(intent, analysis):
                 learning_session["status"] = "skipped"
                 learning_session["reason"] = "capability_already_exists"
-                self.learning_log["learning_sessions"].append(learning_session)
-                self._save_learning_log()
+                with self._log_lock:
+                    self.learning_log["learning_sessions"].append(learning_session)
+                    self._save_learning_log()
                 
                 return {
                     "status": "exists",
@@ -136,8 +141,9 @@ class SelfLearningController:
             if enhancement_plan["priority_level"] == "low" and self.safety_mode:
                 learning_session["status"] = "aborted"
                 learning_session["reason"] = "low_priority_in_safe_mode"
-                self.learning_log["learning_sessions"].append(learning_session)
-                self._save_learning_log()
+                with self._log_lock:
+                    self.learning_log["learning_sessions"].append(learning_session)
+                    self._save_learning_log()
                 
                 return {
                     "status": "deferred",
@@ -155,13 +161,14 @@ class SelfLearningController:
             if not result["success"]:
                 learning_session["status"] = "failed"
                 learning_session["error"] = result["error"]
-                self.learning_log["learning_sessions"].append(learning_session)
-                self.learning_log["validation_errors"].append({
-                    "timestamp": datetime.now().isoformat(),
-                    "intent": intent,
-                    "error": result["error"]
-                })
-                self._save_learning_log()
+                with self._log_lock:
+                    self.learning_log["learning_sessions"].append(learning_session)
+                    self.learning_log["validation_errors"].append({
+                        "timestamp": datetime.now().isoformat(),
+                        "intent": intent,
+                        "error": result["error"]
+                    })
+                    self._save_learning_log()
                 
                 return result
             
@@ -169,36 +176,38 @@ class SelfLearningController:
             print("✅ Step 4: Final validation...")
             validation_result = self._final_validation(result, learning_session)
             
-            if validation_result["success"]:
-                learning_session["status"] = "completed"
-                learning_session["result"] = validation_result
-                self.learning_log["successful_attempts"] += 1
-                self.learning_log["generated_tools"].append({
-                    "timestamp": datetime.now().isoformat(),
-                    "intent": intent,
-                    "tool_name": result.get("tool_name"),
-                    "approach": analysis["implementation_strategy"]["approach"]
-                })
-            else:
-                learning_session["status"] = "validation_failed"
-                learning_session["error"] = validation_result["error"]
-                self.learning_log["validation_errors"].append({
-                    "timestamp": datetime.now().isoformat(),
-                    "intent": intent,
-                    "error": validation_result["error"]
-                })
-            
-            self.learning_log["learning_sessions"].append(learning_session)
-            self._update_success_rate()
-            self._save_learning_log()
+            with self._log_lock:
+                if validation_result["success"]:
+                    learning_session["status"] = "completed"
+                    learning_session["result"] = validation_result
+                    self.learning_log["successful_attempts"] += 1
+                    self.learning_log["generated_tools"].append({
+                        "timestamp": datetime.now().isoformat(),
+                        "intent": intent,
+                        "tool_name": result.get("tool_name"),
+                        "approach": analysis["implementation_strategy"]["approach"]
+                    })
+                else:
+                    learning_session["status"] = "validation_failed"
+                    learning_session["error"] = validation_result["error"]
+                    self.learning_log["validation_errors"].append({
+                        "timestamp": datetime.now().isoformat(),
+                        "intent": intent,
+                        "error": validation_result["error"]
+                    })
+                
+                self.learning_log["learning_sessions"].append(learning_session)
+                self._update_success_rate()
+                self._save_learning_log()
             
             return validation_result
             
         except Exception as e:
             learning_session["status"] = "error"
             learning_session["error"] = str(e)
-            self.learning_log["learning_sessions"].append(learning_session)
-            self._save_learning_log()
+            with self._log_lock:
+                self.learning_log["learning_sessions"].append(learning_session)
+                self._save_learning_log()
             
             print(f"❌ Learning session failed: {e}")
             return {
@@ -608,8 +617,6 @@ Create an improved version that addresses the root cause and fulfills the user's
         }
         
         # Add to learning logs
-        if 'failure_learning' not in self.learning_log:
-            self.learning_log['failure_learning'] = []
-        
-        self.learning_log['failure_learning'].append(learning_entry)
-        self._save_learning_log()
+        with self._log_lock:
+            self.learning_log.setdefault('failure_learning', []).append(learning_entry)
+            self._save_learning_log()
@@ -9,17 +9,65 @@ import os
 import sys
 import json
 import configparser
+import time
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
 
 # Add paths
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import self-learning components
 from mcp.self_learning.self_learning_controller import SelfLearningController
-from mcp.capability_registry import capability_registry
+from mcp.capability_registry import capability_registry, tool_last_tested_epoch, NUMPY_AVAILABLE
 from mcp.dynamic_loader import tool_loader
 
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+# Learning config, resolved once relative to the repo root (override with CHOTU_LEARNING_CONFIG)
+_CONFIG_PATH = Path(os.getenv(
+    'CHOTU_LEARNING_CONFIG',
+    Path(__file__).resolve().parents[1] / "config" / "learning_config.ini"
+))
+_CONFIG_EXISTS = _CONFIG_PATH.exists()
+
+# Capabilities suggested by get_capability_gaps (immutable, shared across calls)
+_SUGGESTED_CAPABILITIES: Tuple[str, ...] = (
+    "file_compression",
+    "email_automation",
+    "calendar_management",
+    "system_monitoring",
+    "network_diagnostics",
+    "media_conversion",
+    "text_processing",
+    "api_integration"
+)
+
+# Tools tested within this window count as recently active
+_RECENT_ACTIVITY_SECONDS = 7 * 86400
+
+# Finished async learning jobs stay pollable this long, and at most this many are kept
+_LEARNING_JOB_TTL_SECONDS = 600
+_MAX_FINISHED_LEARNING_JOBS = 100
+
+def _make_tool_info(capability: str, category: str, description: str,
+                    safety_mode: bool, **extras) -> Dict[str, Any]:
+    """Build the registry info for an auto-generated tool (fixed key order)"""
+    tool_info = {
+        "auto_generated": True,
+        "category": category,
+        "description": description,
+        "capabilities": [capability.lower().replace(" ", "_")],
+        "safety_level": "safe" if safety_mode else "medium"
+    }
+    tool_info.update(extras)
+    return tool_info
+
 class SelfLearningIntegration:
     """Integrates self-learning capabilities with the MCP server"""
     
@@ -30,18 +78,34 @@ class SelfLearningIntegration:
         self.safety_mode = self.config.getboolean('learning', 'safety_mode', fallback=True)
         self.max_tools = self.config.getint('learning', 'max_auto_tools', fallback=50)
         
+        # Learning runs can take seconds (LLM calls, codegen) - offload them to workers
+        self._learning_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="chotu-learning")
+        self._learning_jobs: Dict[str, Future] = {}
+        # request_id -> completion time (monotonic) of finished jobs, oldest first
+        self._finished_jobs: "OrderedDict[str, float]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._registry_lock = threading.Lock()
+        
+        # Track the tool limit incrementally so rejections skip the registry entirely
+        self._at_limit = len(capability_registry.registry["tools"]) >= self.max_tools
+        capability_registry.on_tool_registered(self._on_tool_registered)
+        
         print(f"🔗 Self-Learning Integration initialized")
         print(f"   Auto-learning: {'ON' if self.enabled else 'OFF'}")
         print(f"   Safety mode: {'ON' if self.safety_mode else 'OFF'}")
         print(f"   Max tools: {self.max_tools}")
     
+    def _on_tool_registered(self, tool_name: str, tool_count: int):
+        """Registry callback: flip the cached limit flag once max_tools is reached"""
+        if tool_count >= self.max_tools:
+            self._at_limit = True
+    
     def _load_config(self) -> configparser.ConfigParser:
         """Load the learning configuration"""
         config = configparser.ConfigParser()
-        config_path = "/Users/mahendrabahubali/chotu/config/learning_config.ini"
         
-        if os.path.exists(config_path):
-            config.read(config_path)
+        if _CONFIG_EXISTS:
+            config.read(_CONFIG_PATH)
         else:
             print("⚠️ Learning config not found, using defaults")
         
@@ -61,8 +125,7 @@ class SelfLearningIntegration:
             }
         
         # Check if we've hit the tool limit
-        current_tools = len(capability_registry.registry["tools"])
-        if current_tools >= self.max_tools:
+        if self._at_limit:
             return {
                 "success": False,
                 "reason": "tool_limit_reached",
@@ -84,24 +147,24 @@ class SelfLearningIntegration:
             success = result.get("status") == "success"
             category = "unknown"
             
-            if success and "details" in result:
-                if "tool_created" in result["details"]:
-                    # Register the new tool in the capability registry
-                    tool_name = result["details"]["tool_created"]
-                    tool_info = {
-                        "auto_generated": True,
-                        "category": category,
-                        "description": f"Auto-generated for: {user_request}",
-                        "capabilities": [user_request.lower().replace(" ", "_")],
-                        "safety_level": "safe" if self.safety_mode else "medium"
-                    }
-                    capability_registry.register_tool(tool_name, tool_info)
-                    
-                    # Reload tools in the dynamic loader
-                    tool_loader.load_all_tools()
-            
-            # Update learning statistics
-            capability_registry.update_learning_stats(success, generation_time, category)
+            with self._registry_lock:
+                if success and "details" in result:
+                    if "tool_created" in result["details"]:
+                        # Register the new tool in the capability registry
+                        tool_name = result["details"]["tool_created"]
+                        tool_info = _make_tool_info(
+                            user_request,
+                            category,
+                            f"Auto-generated for: {user_request}",
+                            self.safety_mode
+                        )
+                        capability_registry.register_tool(tool_name, tool_info)
+                        
+                        # Reload tools in the dynamic loader
+                        tool_loader.load_all_tools()
+                
+                # Update learning statistics
+                capability_registry.update_learning_stats(success, generation_time, category)
             
             return result
             
@@ -109,7 +172,8 @@ class SelfLearningIntegration:
             print(f"❌ Auto-learning failed: {e}")
             
             # Update failure statistics
-            capability_registry.update_learning_stats(False, 0, "unknown")
+            with self._registry_lock:
+                capability_registry.update_learning_stats(False, 0, "unknown")
             
             return {
                 "success": False,
@@ -117,6 +181,61 @@ class SelfLearningIntegration:
                 "message": f"Auto-learning failed: {str(e)}"
             }
     
+    def handle_unknown_command_async(self, user_request: str, context: Dict = None,
+                                     request_id: Optional[str] = None) -> Future:
+        """
+        Run handle_unknown_command on a worker thread so the caller is not blocked
+        The returned future carries a request_id usable with get_learning_result
+        """
+        request_id = request_id or uuid.uuid4().hex
+        future = self._learning_executor.submit(self.handle_unknown_command, user_request, context)
+        future.request_id = request_id
+        with self._jobs_lock:
+            self._learning_jobs[request_id] = future
+        # Fire-and-forget callers never poll, so finished jobs expire on their own
+        future.add_done_callback(lambda _: self._on_learning_job_done(request_id))
+        return future
+    
+    def _on_learning_job_done(self, request_id: str):
+        """Future callback: mark a job finished and evict expired or excess finished jobs"""
+        now = time.monotonic()
+        with self._jobs_lock:
+            if request_id not in self._learning_jobs:
+                return
+            self._finished_jobs[request_id] = now
+            while self._finished_jobs:
+                oldest_id, finished_at = next(iter(self._finished_jobs.items()))
+                if (len(self._finished_jobs) <= _MAX_FINISHED_LEARNING_JOBS
+                        and now - finished_at < _LEARNING_JOB_TTL_SECONDS):
+                    break
+                del self._finished_jobs[oldest_id]
+                self._learning_jobs.pop(oldest_id, None)
+    
+    def get_learning_result(self, request_id: str) -> Dict[str, Any]:
+        """Poll the result of a learning request started with handle_unknown_command_async"""
+        with self._jobs_lock:
+            future = self._learning_jobs.get(request_id)
+            if future is not None and future.done():
+                # Finished jobs are handed out once and then forgotten
+                del self._learning_jobs[request_id]
+                self._finished_jobs.pop(request_id, None)
+        
+        if future is None:
+            return {
+                "success": False,
+                "reason": "unknown_request",
+                "message": f"No learning request with id '{request_id}'"
+            }
+        
+        if not future.done():
+            return {
+                "success": False,
+                "status": "pending",
+                "request_id": request_id
+            }
+        
+        return future.result()
+    
     def handle_tool_failure(self, tool_name: str, error_message: str, user_intent: str) -> Dict[str, Any]:
         """
         Handle tool failures by attempting to learn an improved version
@@ -140,25 +259,25 @@ class SelfLearningIntegration:
                 
                 if improved_tool:
                     # Register the improved tool
-                    tool_info = {
-                        "auto_generated": True,
-                        "category": "improved",
-                        "description": f"Improved version of {tool_name}",
-                        "capabilities": [user_intent.lower().replace(" ", "_")],
-                        "safety_level": "safe" if self.safety_mode else "medium",
-                        "replaces": tool_name
-                    }
-                    capability_registry.register_tool(improved_tool, tool_info)
-                    
-                    # Mark original tool as deprecated in registry
-                    original_info = capability_registry.get_tool_info(tool_name)
-                    if original_info:
-                        original_info["deprecated"] = True
-                        original_info["replaced_by"] = improved_tool
-                        capability_registry.save_registry()
-                    
-                    # Reload tools
-                    tool_loader.load_all_tools()
+                    tool_info = _make_tool_info(
+                        user_intent,
+                        "improved",
+                        f"Improved version of {tool_name}",
+                        self.safety_mode,
+                        replaces=tool_name
+                    )
+                    with self._registry_lock:
+                        capability_registry.register_tool(improved_tool, tool_info)
+                        
+                        # Mark original tool as deprecated in registry
+                        original_info = capability_registry.get_tool_info(tool_name)
+                        if original_info:
+                            original_info["deprecated"] = True
+                            original_info["replaced_by"] = improved_tool
+                            capability_registry.save_registry()
+                        
+                        # Reload tools
+                        tool_loader.load_all_tools()
                     
                     print(f"✅ Learned improved tool: {improved_tool}")
             
@@ -195,10 +314,9 @@ class SelfLearningIntegration:
         self.enabled = enabled
         
         # Update config file
-        config_path = "/Users/mahendrabahubali/chotu/config/learning_config.ini"
-        if os.path.exists(config_path):
+        if _CONFIG_EXISTS:
             self.config.set('learning', 'auto_learning_enabled', '1' if enabled else '0')
-            with open(config_path, 'w') as f:
+            with open(_CONFIG_PATH, 'w') as f:
                 self.config.write(f)
         
         print(f"🔄 Auto-learning {'enabled' if enabled else 'disabled'}")
@@ -250,16 +368,7 @@ class SelfLearningIntegration:
         return {
             "missing_categories": recommendations["missing_categories"],
             "low_performing_tools": recommendations["low_performing_tools"],
-            "suggested_capabilities": [
-                "file_compression",
-                "email_automation", 
-                "calendar_management",
-                "system_monitoring",
-                "network_diagnostics",
-                "media_conversion",
-                "text_processing",
-                "api_integration"
-            ],
+            "suggested_capabilities": _SUGGESTED_CAPABILITIES,
             "existing_capabilities": existing_capabilities,
             "total_tools": len(existing_capabilities),
             "health_score": self._calculate_health_score()
@@ -272,6 +381,18 @@ class SelfLearningIntegration:
         if not tools:
             return 0.0
         
+        columns = capability_registry.get_stat_columns()
+        if columns is not None:
+            # Vectorized scan over the registry's SoA stat columns
+            avg_success_rate = float(np.mean(columns["success_rates"]))
+            coverage_score = min(np.unique(columns["categories"]).size * 10, 50)  # Max 50 points for coverage
+            cutoff = time.time() - _RECENT_ACTIVITY_SECONDS
+            recent_tools = int((columns["last_tested_epoch"] >= cutoff).sum())
+            activity_score = min((recent_tools / len(tools)) * 30, 30)  # Max 30 points for activity
+            
+            health_score = (avg_success_rate * 0.2) + coverage_score + activity_score
+            return round(min(health_score, 100), 2)
+        
         # Factors: success rates, tool coverage, recent activity
         total_success_rate = sum(tool.get("success_rate", 0) for tool in tools.values())
         avg_success_rate = total_success_rate / len(tools)
@@ -281,35 +402,20 @@ class SelfLearningIntegration:
         coverage_score = min(len(categories) * 10, 50)  # Max 50 points for coverage
         
         # Activity factor (recent usage = better)
-        recent_tools = 0
-        current_time = datetime.now()
-        
-        for tool in tools.values():
-            last_tested = tool.get("last_tested")
-            if last_tested:
-                try:
-                    # Handle both timezone-aware and naive datetime strings
-                    if last_tested.endswith('Z'):
-                        last_tested = last_tested[:-1] + '+00:00'
-                    elif '+' not in last_tested and 'T' in last_tested:
-                        # Assume naive datetime is local time
-                        test_time = datetime.fromisoformat(last_tested)
-                    else:
-                        test_time = datetime.fromisoformat(last_tested)
-                    
-                    # For timezone-aware comparison, make current_time naive too
-                    if hasattr(test_time, 'tzinfo') and test_time.tzinfo is not None:
-                        test_time = test_time.replace(tzinfo=None)
-                    
-                    if (current_time - test_time).days < 7:
-                        recent_tools += 1
-                except (ValueError, TypeError):
-                    # Skip invalid datetime strings
-                    continue
+        cutoff = time.time() - _RECENT_ACTIVITY_SECONDS
+        recent_tools = sum(1 for tool in tools.values() if tool_last_tested_epoch(tool) >= cutoff)
         activity_score = min((recent_tools / len(tools)) * 30, 30)  # Max 30 points for activity
         
         health_score = (avg_success_rate * 0.2) + coverage_score + activity_score
         return round(min(health_score, 100), 2)
 
-# Global instance
-self_learning_integration = SelfLearningIntegration()
+# Global instance (created lazily on first access, see PEP 562)
+_self_learning_integration: Optional[SelfLearningIntegration] = None
+
+def __getattr__(name: str):
+    if name == "self_learning_integration":
+        global _self_learning_integration
+        if _self_learning_integration is None:
+            _self_learning_integration = SelfLearningIntegration()
+        return _self_learning_integration
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
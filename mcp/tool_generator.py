@@ -6,86 +6,48 @@ Automatically generates new tools when MCP encounters unknown commands
 """
 
 import os
+import re
 import json
+import shutil
+import asyncio
+import marshal
+import tempfile
 import importlib
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 
 # Import specialized GPT interface functions
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.gpt_interface import call_gpt_learning, call_gpt_coding, call_gpt_context
-
-class ToolGenerator:
-    """Generates new tools dynamically based on user requests"""
-    
-    def __init__(self):
-        # Auto-detect tools directory
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        self.tools_dir = os.path.join(current_dir, "tools")
-        self.pending_tasks = []
-        self.learned_tools = []
-        
-    def analyze_unknown_command(self, user_request, current_capabilities):
-        """Analyze what new tool is needed using learning model"""
-        prompt = f"""
-You are an expert Python developer for an AI assistant MCP server.
-
-USER REQUEST: {user_request}
-CURRENT CAPABILITIES: {current_capabilities}
-
-This request failed because we don't have the right tool. Analyze what's needed:
-
-1. What specific functionality is missing?
-2. What would be the best tool name (snake_case)?
-3. What parameters would this tool need?
-4. What imports/libraries might be required?
-
-Respond in JSON format:
-{{
-    "missing_capability": "description of what's missing",
-    "tool_name": "suggested_tool_name",
-    "tool_category": "system|app|file|web|communication",
-    "parameters": ["param1", "param2"],
-    "required_imports": ["import1", "import2"],
-    "complexity": "simple|medium|complex"
-}}
-"""
-        
-        try:
-            response = call_gpt_learning(prompt)  # Use learning model for analysis
-            # Clean JSON response
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            return json.loads(response.strip())
-        except Exception as e:
-            print(f"❌ Failed to analyze command: {e}")
-            return None
-    
-    def generate_tool_code(self, tool_analysis, user_request):
-        """Generate Python code for the new tool"""
-        
-        # Load tool schema for system context
-        schema_path = os.path.join(os.path.dirname(self.tools_dir), "tool_schema.json")
-        tool_schema = {}
-        try:
-            with open(schema_path, 'r') as f:
-                tool_schema = json.load(f)
-        except Exception as e:
-            print(f"⚠️ Could not load tool schema: {e}")
-        
-        prompt = f"""
-You are an expert Python developer creating tools for macOS. Generate a complete Python tool for an MCP server.
-
-SYSTEM CONTEXT: {json.dumps(tool_schema, indent=2)}
-
-TOOL ANALYSIS: {json.dumps(tool_analysis, indent=2)}
-ORIGINAL USER REQUEST: {user_request}
-
-CRITICAL INSTRUCTIONS:
+from utils.gpt_interface import call_gpt_learning, call_gpt_coding, call_gpt_context, call_gpt_coding_stream
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_loads(data):
+    """Parse JSON text/bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(obj, indent=False, sort_keys=False):
+    """Serialize to a JSON string (non-JSON values via str), using orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys, default=str)
+
+# Shared macOS tool-generation rules used by the code generation system prompts
+_TOOL_CODE_RULES = """CRITICAL INSTRUCTIONS:
 1. Use ONLY commands/tools listed in "guaranteed_available" or "built_in_apps"
 2. For "may_not_be_installed" tools, ALWAYS check existence first with 'which tool_name'
 3. Follow the macOS-specific patterns exactly as shown in the schema
@@ -119,66 +81,393 @@ FOR FILES/FOLDERS:
 - Create folder: os.makedirs(path, exist_ok=True) or mkdir -p
 - Open folder: open 'FOLDER_PATH'
 - Replace FOLDER_PATH with actual path
+"""
 
-Example structure:
+# Static system prompt for single-tool code generation (the schema is appended once)
+_TOOL_GEN_SYSTEM_PROMPT = _TOOL_CODE_RULES + """
+Example structure (name the file and main function after the tool):
 ```python
-# mcp/tools/{tool_analysis['tool_name']}.py
 import subprocess
-import os
-from datetime import datetime
 
-def {tool_analysis['tool_name']}(param1=None, param2=None):
+def tool_name(param1=None, param2=None):
     \"\"\"
-    {tool_analysis.get('missing_capability', 'Tool description')}
-    
-    Args:
-        param1: Description (optional with default)
-        param2: Description (optional with default)
+    Tool description
     
     Returns:
         str: Success/error message with ✅/❌ prefix
     \"\"\"
     try:
-        # Check if external tool needed and exists
-        # Use appropriate macOS command from schema
-        # Implement with proper error handling
-        return f"✅ Success: Operation completed"
+        # Use the appropriate macOS command from the schema
+        return "✅ Success: Operation completed"
     except Exception as e:
-        return f"❌ Error: " + str(e)
+        return "❌ Error: " + str(e)
 ```
 
-RESPOND WITH ONLY THE PYTHON CODE, NO EXPLANATIONS.
+RESPOND WITH ONLY THE PYTHON CODE, NO EXPLANATIONS."""
+
+# Static system prompt for the fused analyze + generate call
+_ANALYZE_AND_GENERATE_SYSTEM_PROMPT = """The user request failed because we don't have the right tool. Work out what's missing
+(functionality, snake_case tool name, parameters, imports) and write the tool.
+
+""" + _TOOL_CODE_RULES + """
+The tool must be a complete Python file whose main function has the same name as the tool,
+uses optional parameters with defaults and returns a string with a ✅/❌ prefix.
+
+Respond with ONLY this JSON object:
+{
+    "analysis": {
+        "missing_capability": "description of what's missing",
+        "tool_name": "suggested_tool_name",
+        "tool_category": "system|app|file|web|communication",
+        "parameters": ["param1", "param2"],
+        "required_imports": ["import1", "import2"],
+        "complexity": "simple|medium|complex"
+    },
+    "code": "complete Python source of the tool"
+}"""
+
+# Static system prompt for intelligent_learn's failure analysis
+_INTELLIGENT_LEARN_SYSTEM_PROMPT = """You are an AI system that learns from context like a human baby. Analyze the failure described by the user message and plan the correct solution.
+
+Work out:
+1. What the user ACTUALLY wanted vs what the system did
+2. Whether this requires a NEW function or FIXING an existing one
+3. The exact functionality needed
+
+Consider:
+- Did the system misinterpret the command? (e.g., "bluetooth devices" → "enable bluetooth")
+- Is this a missing feature in an existing module? (e.g., bluetooth module missing list_devices)
+- Does this need a completely new tool/module?
+- Can the correct behavior be inferred from similar existing functions?
+
+Respond in JSON format:
+{
+    "analysis_type": "misinterpretation|missing_feature|new_capability",
+    "root_cause": "detailed explanation of what went wrong",
+    "user_actual_intent": "what the user really wanted",
+    "solution_approach": "enhance_existing|create_new|fix_routing",
+    "target_module": "which existing module to enhance (if applicable)",
+    "function_needed": "specific function name needed",
+    "implementation_strategy": "detailed plan for implementation",
+    "test_criteria": "how to verify the fix works"
+}"""
+
+# Leading ```json / ```python (or bare ```) fence and trailing ``` fence of a GPT response
+_CODE_FENCE_RE = re.compile(r'\A\s*```(?:json|python|py)?[ \t]*\n?|\n?```\s*\Z')
+
+# Whole-request shapes that map to a generic tool without asking the LLM to classify.
+# Patterns are anchored so compound requests ("send an email with the file attached")
+# fall through to the LLM; each yields (category, tool name built from the match)
+_QUICK_VERB_ALIASES = {
+    'launch': 'open', 'start': 'open', 'close': 'quit', 'make': 'create', 'remove': 'delete',
+}
+_QUICK_ANALYSIS_PATTERNS = (
+    (re.compile(r'^(?:open|go to|visit)\s+(?:https?://\S+|www\.\S+|[\w-]+\.(?:com|org|net|io|in)\S*)$', re.I),
+     'web', lambda m: "open_website"),
+    (re.compile(r'^(?:set|change|increase|decrease|raise|lower|turn (?:up|down))\s+(?:the\s+)?'
+                r'(?P<setting>volume|brightness)(?:\s+to\s+\d+%?)?$', re.I),
+     'system', lambda m: f"set_{m.group('setting').lower()}"),
+    (re.compile(r'^(?P<verb>create|make|delete|remove)\s+(?:a\s+|the\s+)?(?:new\s+)?'
+                r'(?P<object>file|folder|directory)\b[\w ./~-]*$', re.I),
+     'file', lambda m: f"{_quick_verb(m.group('verb'))}_{m.group('object').lower()}"),
+    (re.compile(r'^(?P<verb>open|launch|start|quit|close)\s+(?:the\s+)?'
+                r'(?!.*\b(?:and|then|with|file|folder|directory|tab|window|website|url)\b)'
+                r'[a-z][\w-]*(?:\s+[a-z][\w-]*){0,2}$', re.I),
+     'app', lambda m: f"{_quick_verb(m.group('verb'))}_app"),
+)
+
+# Pre-built analysis fields for each quick category
+_QUICK_ANALYSIS_TEMPLATES = {
+    'app': {"parameters": ["app_name"], "required_imports": ["subprocess"]},
+    'system': {"parameters": ["level"], "required_imports": ["subprocess"]},
+    'file': {"parameters": ["path"], "required_imports": ["os", "subprocess"]},
+    'web': {"parameters": ["url"], "required_imports": ["subprocess"]},
+}
+
+def _quick_verb(verb):
+    """Canonical verb for a quick-analysis tool name (launch -> open, make -> create, ...)"""
+    verb = verb.lower()
+    return _QUICK_VERB_ALIASES.get(verb, verb)
+
+def _strip_code_fence(text):
+    """Strip markdown code fences and surrounding whitespace from a GPT response"""
+    return _CODE_FENCE_RE.sub('', text).strip()
+
+def _write_text_atomic(path, text):
+    """Write UTF-8 text via a sibling temp file + os.replace, so a crash never leaves a half-written file"""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def _iter_unfenced_lines(chunks):
+    """
+    Turn a streamed GPT code response into lines, dropping the opening and closing
+    code fences and surrounding blank lines as the text arrives.
+    Lines from the last non-blank one onwards are held back until more content
+    proves they aren't the closing fence.
+    """
+    buffer = ""
+    started = False
+    pending = []
+    
+    def feed(line):
+        nonlocal started, pending
+        if not started:
+            if not line.strip():
+                return []
+            started = True
+            if line.lstrip().startswith("```"):
+                return []
+        if not line.strip():
+            pending.append(line)
+            return []
+        ready, pending = pending, [line]
+        return ready
+    
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield from feed(line)
+    yield from feed(buffer)
+    
+    # pending = last non-blank line + trailing blank lines
+    if pending and pending[0].strip() != "```":
+        yield pending[0].rstrip()
+
+class ToolGenerator:
+    """Generates new tools dynamically based on user requests"""
+    
+    def __init__(self, warm_imports=False):
+        # Auto-detect tools directory
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        self.tools_dir = os.path.join(current_dir, "tools")
+        self._tools_dir = Path(self.tools_dir)
+        self.pending_tasks = []
+        self.learned_tools = []
+        self._schema_path = os.path.join(current_dir, "tool_schema.json")
+        self._tool_schema = None
+        self._tool_schema_json = None
+        # tool_name -> (mtime_ns, module) for tools already imported by test_new_tool
+        self._loaded_tools = {}
+        
+        # Append-only log of learned tools (JSON Lines), next to this module rather than the cwd
+        self.learning_log_path = os.path.join(current_dir, "learning_log.jsonl")
+        # Pre-JSONL learning_log.json files ({"learned_tools": [...]}), read once on demand
+        self._legacy_log_paths = (
+            os.path.join(os.path.dirname(current_dir), "learning_log.json"),
+            os.path.abspath("learning_log.json")
+        )
+        self._legacy_history = None
+        
+        if warm_imports:
+            self._warm_tool_imports()
+    
+    def _warm_tool_imports(self):
+        """
+        Pre-import existing tools in the background (fire-and-forget) so their shared
+        dependencies are already in sys.modules when test_new_tool imports a new tool.
+        Opt-in (warm_imports=True): importing a tool runs its module-level setup
+        """
+        try:
+            tool_names = [
+                path.stem for path in self._tools_dir.glob("*.py")
+                if not path.name.startswith(("_", "test_"))
+            ]
+        except OSError:
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tool-warmup")
+        for tool_name in tool_names:
+            executor.submit(importlib.import_module, f"mcp.tools.{tool_name}")
+        # Don't block on the imports; worker threads exit once the queue is drained
+        executor.shutdown(wait=False)
+    
+    def _get_tool_schema(self):
+        """Load the tool schema (system context) on first use and memoize it"""
+        if self._tool_schema is None:
+            try:
+                with open(self._schema_path, 'rb') as f:
+                    self._tool_schema = _json_loads(f.read())
+            except Exception as e:
+                print(f"⚠️ Could not load tool schema: {e}")
+                self._tool_schema = {}
+            # Serialize once - the schema doesn't change during a process lifetime
+            self._tool_schema_json = _json_dumps(self._tool_schema, indent=True)
+        return self._tool_schema
+    
+    def _get_tool_schema_json(self):
+        """Get the memoized, pre-serialized tool schema for prompt interpolation"""
+        self._get_tool_schema()
+        return self._tool_schema_json
+        
+    def _quick_analysis(self, user_request):
+        """Classify common single-action requests without an LLM call; None when no pattern matches"""
+        request = " ".join(user_request.split()).rstrip(".!?")
+        for pattern, category, name_for in _QUICK_ANALYSIS_PATTERNS:
+            match = pattern.match(request)
+            if match:
+                template = _QUICK_ANALYSIS_TEMPLATES[category]
+                return {
+                    "missing_capability": f"Tool to {request}",
+                    "tool_name": name_for(match),
+                    "tool_category": category,
+                    "parameters": list(template["parameters"]),
+                    "required_imports": list(template["required_imports"]),
+                    "complexity": "simple"
+                }
+        return None
+    
+    def analyze_unknown_command(self, user_request, current_capabilities):
+        """Analyze what new tool is needed using learning model"""
+        prompt = f"""
+You are an expert Python developer for an AI assistant MCP server.
+
+USER REQUEST: {user_request}
+CURRENT CAPABILITIES: {current_capabilities}
+
+This request failed because we don't have the right tool. Analyze what's needed:
+
+1. What specific functionality is missing?
+2. What would be the best tool name (snake_case)?
+3. What parameters would this tool need?
+4. What imports/libraries might be required?
 
-Generate ONLY the Python code, no explanations:
+Respond in JSON format:
+{{
+    "missing_capability": "description of what's missing",
+    "tool_name": "suggested_tool_name",
+    "tool_category": "system|app|file|web|communication",
+    "parameters": ["param1", "param2"],
+    "required_imports": ["import1", "import2"],
+    "complexity": "simple|medium|complex"
+}}
 """
         
         try:
-            return call_gpt_coding(prompt)  # Use coding model for code generation
+            response = call_gpt_learning(prompt)  # Use learning model for analysis
+            # Clean JSON response
+            return _json_loads(_strip_code_fence(response))
+        except Exception as e:
+            print(f"❌ Failed to analyze command: {e}")
+            return None
+    
+    def _get_system_prompt(self, instructions, schema_json=None):
+        """Prefix static system instructions with the (memoized) tool schema"""
+        if schema_json is None:
+            schema_json = self._get_tool_schema_json()
+        return (
+            "You are an expert Python developer creating tools for macOS for an AI assistant MCP server.\n\n"
+            f"SYSTEM CONTEXT: {schema_json}\n\n{instructions}"
+        )
+    
+    def _build_tool_code_prompt(self, tool_analysis, user_request):
+        """Build the per-call user message for tool code generation"""
+        return f"TOOL ANALYSIS: {_json_dumps(tool_analysis)}\nUSER REQUEST: {user_request}"
+    
+    def generate_tool_code(self, tool_analysis, user_request):
+        """Generate Python code for the new tool"""
+        prompt = self._build_tool_code_prompt(tool_analysis, user_request)
+        
+        try:
+            return call_gpt_coding(prompt, self._get_system_prompt(_TOOL_GEN_SYSTEM_PROMPT))
         except Exception as e:
             print(f"❌ Failed to generate tool code: {e}")
             return None
     
+    def analyze_and_generate(self, user_request, current_capabilities, tool_schema=None):
+        """
+        Analyze an unknown command AND generate its tool code in a single GPT call
+        Returns (analysis, tool_code) or (None, None) on failure
+        """
+        schema_json = None if tool_schema is None else _json_dumps(tool_schema, indent=True)
+        system_prompt = self._get_system_prompt(_ANALYZE_AND_GENERATE_SYSTEM_PROMPT, schema_json)
+        
+        prompt = f"USER REQUEST: {user_request}\nCURRENT CAPABILITIES: {current_capabilities}"
+        
+        try:
+            response = call_gpt_coding(prompt, system_prompt)  # One coding-model round-trip for both steps
+            result = _json_loads(_strip_code_fence(response))
+            return result["analysis"], result["code"]
+        except Exception as e:
+            print(f"❌ Failed to analyze and generate tool: {e}")
+            return None, None
+    
+    @staticmethod
+    def _write_tool_bytecode(file_path, code):
+        """Write compiled tool bytecode to __pycache__ so the first import skips parsing"""
+        try:
+            source_stat = os.stat(file_path)
+            pyc_path = importlib.util.cache_from_source(os.fspath(file_path))
+            os.makedirs(os.path.dirname(pyc_path), exist_ok=True)
+            # Timestamp-based pyc header (PEP 552): magic, flags, source mtime, source size
+            header = importlib.util.MAGIC_NUMBER + (0).to_bytes(4, 'little')
+            header += (int(source_stat.st_mtime) & 0xFFFFFFFF).to_bytes(4, 'little')
+            header += (source_stat.st_size & 0xFFFFFFFF).to_bytes(4, 'little')
+            with open(pyc_path, 'wb') as f:
+                f.write(header + marshal.dumps(code))
+        except OSError as e:
+            # Only an optimization - the import will compile from source instead
+            print(f"⚠️ Could not cache tool bytecode: {e}")
+    
     def save_new_tool(self, tool_name, tool_code):
         """Save the generated tool to the tools directory"""
         try:
             # Clean the code
-            if tool_code.startswith('```python'):
-                tool_code = tool_code[9:]
-            if tool_code.endswith('```'):
-                tool_code = tool_code[:-3]
-            tool_code = tool_code.strip()
+            tool_code = _strip_code_fence(tool_code)
+            file_path = self._tools_dir / f"{tool_name}.py"
+            source = tool_code.encode('utf-8')
+            
+            # Reject invalid Python before touching the disk
+            try:
+                code = compile(source, os.fspath(file_path), 'exec')
+            except SyntaxError as e:
+                print(f"❌ Generated tool has invalid syntax: {e}")
+                return None
             
             # Save to file
-            file_path = f"{self.tools_dir}/{tool_name}.py"
-            with open(file_path, 'w') as f:
-                f.write(tool_code)
+            with open(file_path, 'wb') as f:
+                f.write(source)
+            self._write_tool_bytecode(file_path, code)
             
             print(f"💾 New tool saved: {file_path}")
-            return file_path
+            return str(file_path)
         except Exception as e:
             print(f"❌ Failed to save tool: {e}")
             return None
     
+    def stream_new_tool(self, tool_name, prompt, system_prompt=None):
+        """
+        Stream generated tool code into a temp file in the tools directory and
+        atomically move it into place once the response is complete
+        """
+        file_path = self._tools_dir / f"{tool_name}.py"
+        tmp = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=self._tools_dir, prefix=f".{tool_name}.", suffix=".tmp", delete=False
+            ) as tmp:
+                lines = _iter_unfenced_lines(call_gpt_coding_stream(prompt, system_prompt))
+                for line_number, line in enumerate(lines):
+                    if line_number:
+                        tmp.write("\n")
+                    tmp.write(line)
+            
+            # Reject invalid Python before it replaces anything in the tools directory
+            with open(tmp.name, 'rb') as f:
+                code = compile(f.read(), os.fspath(file_path), 'exec')
+            os.replace(tmp.name, file_path)
+            self._write_tool_bytecode(file_path, code)
+            
+            print(f"💾 New tool saved: {file_path}")
+            return str(file_path)
+        except Exception as e:
+            print(f"❌ Failed to stream tool: {e}")
+            if tmp is not None and os.path.exists(tmp.name):
+                os.remove(tmp.name)
+            return None
+    
     def reload_tools(self):
         """Dynamically reload all tools"""
         try:
@@ -192,15 +481,29 @@ Generate ONLY the Python code, no explanations:
             print(f"❌ Failed to reload tools: {e}")
             return False
     
+    def _import_tool(self, tool_name):
+        """Import a tool module, reusing the cached module while its file is unchanged"""
+        file_path = self._tools_dir / f"{tool_name}.py"
+        mtime = file_path.stat().st_mtime_ns
+        
+        cached = self._loaded_tools.get(tool_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        spec = importlib.util.spec_from_file_location(tool_name, file_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        
+        self._loaded_tools[tool_name] = (mtime, module)
+        # Expose to importlib.import_module, without shadowing unrelated modules
+        if tool_name not in sys.modules or (cached and sys.modules[tool_name] is cached[1]):
+            sys.modules[tool_name] = module
+        return module
+    
     def test_new_tool(self, tool_name, original_request):
         """Test if the new tool works for the original request"""
         try:
-            # Import the new tool
-            spec = importlib.util.spec_from_file_location(
-                tool_name, f"{self.tools_dir}/{tool_name}.py"
-            )
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            module = self._import_tool(tool_name)
             
             # Get the main function (assumes same name as file)
             if hasattr(module, tool_name):
@@ -224,58 +527,16 @@ Generate ONLY the Python code, no explanations:
         """
         print(f"🧠 INTELLIGENT LEARNING: Analyzing context...")
         
-        prompt = f"""
-You are an AI system that learns from context like a human baby. Analyze this failure and implement the correct solution.
-
-CONTEXT ANALYSIS:
-=================
-Failed Command: {learning_context['failed_command']}
+        prompt = f"""Failed Command: {learning_context['failed_command']}
 User Feedback: {learning_context['user_feedback']}
 Error Context: {learning_context['error_context']}
 Confidence Data: {learning_context['confidence_data']}
 NLP Analysis: {learning_context['nlp_analysis']}
-
-EXISTING CAPABILITIES:
-=====================
-{json.dumps(learning_context['existing_capabilities'], indent=2)}
-
-LEARNING TASK:
-==============
-The user said: "{learning_context['user_feedback']}"
-The system tried: "{learning_context['failed_command']}"
-
-From this interaction, I need to:
-1. Understand what the user ACTUALLY wanted vs what the system did
-2. Identify if this requires a NEW function or FIXING an existing one
-3. Determine the exact functionality needed
-
-ANALYSIS QUESTIONS:
-- Did the system misinterpret the command? (e.g., "bluetooth devices" → "enable bluetooth")
-- Is this a missing feature in an existing module? (e.g., bluetooth module missing list_devices)
-- Does this need a completely new tool/module?
-- Can I infer the correct behavior from similar existing functions?
-
-Respond in JSON format:
-{{
-    "analysis_type": "misinterpretation|missing_feature|new_capability",
-    "root_cause": "detailed explanation of what went wrong",
-    "user_actual_intent": "what the user really wanted",
-    "solution_approach": "enhance_existing|create_new|fix_routing",
-    "target_module": "which existing module to enhance (if applicable)",
-    "function_needed": "specific function name needed",
-    "implementation_strategy": "detailed plan for implementation",
-    "test_criteria": "how to verify the fix works"
-}}
-"""
+Existing Capabilities: {_json_dumps(learning_context['existing_capabilities'])}"""
         
         try:
-            response = call_gpt_learning(prompt)  # Use learning model for intelligent analysis
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            analysis = json.loads(response.strip())
+            response = call_gpt_learning(prompt, _INTELLIGENT_LEARN_SYSTEM_PROMPT)  # Use learning model for intelligent analysis
+            analysis = _json_loads(_strip_code_fence(response))
             
             print(f"🎯 Intelligent Analysis: {analysis['analysis_type']}")
             print(f"🔍 Root Cause: {analysis['root_cause']}")
@@ -298,16 +559,29 @@ Respond in JSON format:
     
     def enhance_existing_module(self, analysis, learning_context):
         """Enhance an existing module with missing functionality"""
+        return asyncio.run(self.enhance_existing_module_async(analysis, learning_context))
+    
+    @staticmethod
+    def _backup_module(module_path, backup_path):
+        """Back up a module as a hard link (zero-copy), falling back to a file copy"""
+        if backup_path.exists():
+            backup_path.unlink()
+        try:
+            os.link(module_path, backup_path)
+        except OSError:
+            shutil.copy2(module_path, backup_path)
+    
+    async def enhance_existing_module_async(self, analysis, learning_context):
+        """Enhance an existing module, backing it up while the LLM call is in flight"""
         print(f"🔧 Enhancing existing module: {analysis['target_module']}")
         
         # Read the existing module
-        module_path = os.path.join(self.tools_dir, f"{analysis['target_module']}.py")
-        if not os.path.exists(module_path):
+        module_path = self._tools_dir / f"{analysis['target_module']}.py"
+        if not module_path.exists():
             print(f"❌ Module {analysis['target_module']} not found")
             return False
         
-        with open(module_path, 'r') as f:
-            existing_code = f.read()
+        existing_code = module_path.read_text(encoding='utf-8')
         
         # Generate the enhancement
         prompt = f"""
@@ -332,20 +606,16 @@ Return the COMPLETE enhanced module code:
 """
         
         try:
-            enhanced_code = call_gpt_coding(prompt)  # Use coding model for code enhancement
-            if enhanced_code.startswith('```python'):
-                enhanced_code = enhanced_code[9:]
-            if enhanced_code.endswith('```'):
-                enhanced_code = enhanced_code[:-3]
-            enhanced_code = enhanced_code.strip()
-            
-            # Backup original and save enhanced version
-            backup_path = f"{module_path}.backup"
-            with open(backup_path, 'w') as f:
-                f.write(existing_code)
+            # Backup original while the coding model generates the enhancement
+            backup_path = module_path.with_name(f"{module_path.name}.backup")
+            enhanced_code, _ = await asyncio.gather(
+                asyncio.to_thread(call_gpt_coding, prompt),  # Use coding model for code enhancement
+                asyncio.to_thread(self._backup_module, module_path, backup_path)
+            )
+            enhanced_code = _strip_code_fence(enhanced_code)
             
-            with open(module_path, 'w') as f:
-                f.write(enhanced_code)
+            # Save enhanced version as a new file so the hard-linked backup keeps the original
+            _write_text_atomic(module_path, enhanced_code)
             
             print(f"✅ Enhanced module saved: {module_path}")
             print(f"📁 Backup created: {backup_path}")
@@ -412,13 +682,8 @@ Respond with a corrective action plan in JSON:
 """
         
         try:
-            response = call_gpt(prompt)
-            response = response.strip()
-            if response.startswith('```json'):
-                response = response[7:]
-            if response.endswith('```'):
-                response = response[:-3]
-            adaptive_plan = json.loads(response.strip())
+            response = call_gpt_learning(prompt)  # Use learning model for the corrective plan
+            adaptive_plan = _json_loads(_strip_code_fence(response))
             
             print(f"🔄 Adaptive Plan: {adaptive_plan['corrective_action']}")
             print(f"🎯 Strategy: {adaptive_plan['new_strategy']}")
@@ -441,14 +706,13 @@ Respond with a corrective action plan in JSON:
         print(f"🔧 Applying code corrections...")
         
         target_module = adaptive_plan['target_module']
-        module_path = os.path.join(self.tools_dir, f"{target_module}.py")
+        module_path = self._tools_dir / f"{target_module}.py"
         
-        if not os.path.exists(module_path):
+        if not module_path.exists():
             print(f"❌ Target module {target_module} not found")
             return False
         
-        with open(module_path, 'r') as f:
-            current_code = f.read()
+        current_code = module_path.read_text(encoding='utf-8')
         
         prompt = f"""
 Apply specific corrections to this code:
@@ -467,14 +731,9 @@ Return the corrected code:
         
         try:
             corrected_code = call_gpt_coding(prompt)  # Use coding model for code correction
-            if corrected_code.startswith('```python'):
-                corrected_code = corrected_code[9:]
-            if corrected_code.endswith('```'):
-                corrected_code = corrected_code[:-3]
-            corrected_code = corrected_code.strip()
+            corrected_code = _strip_code_fence(corrected_code)
             
-            with open(module_path, 'w') as f:
-                f.write(corrected_code)
+            _write_text_atomic(module_path, corrected_code)
             
             print(f"✅ Code corrections applied to: {module_path}")
             return True
@@ -500,16 +759,10 @@ Return only the Python code:
 """
         
         try:
-            tool_code = call_gpt_coding(prompt)  # Use coding model for adaptive tool generation
-            if tool_code.startswith('```python'):
-                tool_code = tool_code[9:]
-            if tool_code.endswith('```'):
-                tool_code = tool_code[:-3]
-            tool_code = tool_code.strip()
-            
             # Determine tool name from adaptive plan
             tool_name = adaptive_plan.get('target_module', 'adaptive_tool')
-            tool_file = self.save_new_tool(tool_name, tool_code)
+            # Stream from the coding model straight into the tool file
+            tool_file = self.stream_new_tool(tool_name, prompt)
             
             if tool_file:
                 print(f"✅ Adaptive tool created: {tool_file}")
@@ -528,68 +781,35 @@ Return only the Python code:
         """
         print(f"🎓 Basic Learning: {user_request}")
         
-        # Analyze what the user is asking for
-        analysis = self.analyze_unknown_command(user_request, current_capabilities)
-        
-        if analysis['requires_new_tool']:
-            print(f"📝 Generating new tool: {analysis['suggested_tool_name']}")
+        # Common single-action requests are classified locally, leaving only code generation,
+        # which is streamed straight into the tools directory; a quick match never
+        # overwrites an existing tool of the same generic name
+        analysis = self._quick_analysis(user_request)
+        if analysis and not (self._tools_dir / f"{analysis['tool_name']}.py").exists():
+            print(f"📝 Generating new tool: {analysis['tool_name']}")
+            prompt = self._build_tool_code_prompt(analysis, user_request)
+            tool_file = self.stream_new_tool(
+                analysis['tool_name'], prompt, self._get_system_prompt(_TOOL_GEN_SYSTEM_PROMPT)
+            )
+        else:
+            # Analyze what the user is asking for and generate the tool in one call; the code
+            # arrives inside the JSON reply, so this path is saved whole rather than streamed
+            analysis, tool_code = self.analyze_and_generate(user_request, current_capabilities)
+            tool_file = None
+            if analysis and tool_code:
+                print(f"📝 Generating new tool: {analysis['tool_name']}")
+                tool_file = self.save_new_tool(analysis['tool_name'], tool_code)
+        
+        if tool_file:
+            print(f"✅ New capability learned and saved: {tool_file}")
             
-            # Generate the tool code
-            tool_code = self.generate_tool_code(analysis)
+            # Record this learning
+            self.record_learning(user_request, analysis, tool_file)
             
-            if tool_code:
-                # Save the new tool
-                tool_file = self.save_new_tool(analysis['suggested_tool_name'], tool_code)
-                
-                if tool_file:
-                    print(f"✅ New capability learned and saved: {tool_file}")
-                    
-                    # Record this learning
-                    self.record_learning(user_request, analysis, tool_file)
-                    
-                    return {
-                        'success': True,
-                        'tool_created': tool_file,
-                        'capability': analysis['suggested_tool_name']
-                    }
+            return True
         
         print(f"❌ Failed to learn new capability")
-        return {'success': False}
-    
-    def generate_contextual_tool(self, tool_analysis, learning_context):
-        """Generate a tool with full context awareness"""
-        print(f"🧠 Generating contextual tool with full awareness...")
-        
-        prompt = f"""
-Generate a contextual tool that understands the full learning context:
-
-TOOL ANALYSIS: {tool_analysis}
-LEARNING CONTEXT: {learning_context}
-USER'S ACTUAL INTENT: {tool_analysis['missing_capability']}
-
-Create a Python tool that:
-1. Addresses the user's exact intent
-2. Handles the specific use case that failed
-3. Integrates well with existing capabilities
-4. Follows established patterns and conventions
-
-Return the complete Python code:
-"""
-        
-        try:
-            tool_code = call_gpt(prompt)
-            if tool_code.startswith('```python'):
-                tool_code = tool_code[9:]
-            if tool_code.endswith('```'):
-                tool_code = tool_code[:-3]
-            tool_code = tool_code.strip()
-            
-            tool_file = self.save_new_tool(tool_analysis['tool_name'], tool_code)
-            return tool_file is not None
-            
-        except Exception as e:
-            print(f"❌ Contextual tool generation failed: {e}")
-            return False
+        return False
     
     def generate_contextual_tool(self, tool_analysis, learning_context):
         """Generate a tool with full context awareness"""
@@ -612,12 +832,8 @@ Return the complete Python code:
 """
         
         try:
-            tool_code = call_gpt(prompt)
-            if tool_code.startswith('```python'):
-                tool_code = tool_code[9:]
-            if tool_code.endswith('```'):
-                tool_code = tool_code[:-3]
-            tool_code = tool_code.strip()
+            tool_code = call_gpt_coding(prompt)  # Use coding model for code generation
+            tool_code = _strip_code_fence(tool_code)
             
             tool_file = self.save_new_tool(tool_analysis['tool_name'], tool_code)
             return tool_file is not None
@@ -625,36 +841,6 @@ Return the complete Python code:
         except Exception as e:
             print(f"❌ Contextual tool generation failed: {e}")
             return False
-        """Complete learning process for new capability"""
-        print(f"🧠 Learning new capability for: {user_request}")
-        
-        # Step 1: Analyze what's needed
-        analysis = self.analyze_unknown_command(user_request, current_capabilities)
-        if not analysis:
-            return False
-        
-        print(f"📊 Analysis: {analysis['missing_capability']}")
-        print(f"🔧 Generating tool: {analysis['tool_name']}")
-        
-        # Step 2: Generate tool code
-        tool_code = self.generate_tool_code(analysis, user_request)
-        if not tool_code:
-            return False
-        
-        # Step 3: Save the tool
-        tool_file = self.save_new_tool(analysis['tool_name'], tool_code)
-        if not tool_file:
-            return False
-        
-        # Step 4: Reload tools
-        if not self.reload_tools():
-            return False
-        
-        # Step 5: Record the learning
-        self.record_learning(user_request, analysis, tool_file)
-        
-        print(f"🎉 Successfully learned new capability: {analysis['tool_name']}")
-        return True
     
     def record_learning(self, original_request, analysis, tool_file):
         """Record what was learned for future reference"""
@@ -667,23 +853,50 @@ Return the complete Python code:
             "category": analysis['tool_category']
         }
         
-        # Save to learning log
-        log_file = "learning_log.json"
+        # Append to the learning log (one JSON record per line)
         try:
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            else:
-                log_data = {"learned_tools": []}
-            
-            log_data["learned_tools"].append(learning_record)
-            
-            with open(log_file, 'w') as f:
-                json.dump(log_data, f, indent=2)
+            with open(self.learning_log_path, 'a', encoding='utf-8') as f:
+                f.write(_json_dumps(learning_record) + "\n")
                 
-            print(f"📚 Learning recorded in {log_file}")
+            print(f"📚 Learning recorded in {self.learning_log_path}")
         except Exception as e:
             print(f"⚠️ Failed to record learning: {e}")
+    
+    def _load_legacy_history(self):
+        """Read learnings from the old learning_log.json format once; the files are left untouched"""
+        if self._legacy_history is None:
+            self._legacy_history = []
+            seen = set()
+            for path in self._legacy_log_paths:
+                real_path = os.path.realpath(path)
+                if real_path in seen:
+                    continue
+                seen.add(real_path)
+                try:
+                    with open(path, 'rb') as f:
+                        self._legacy_history.extend(_json_loads(f.read()).get("learned_tools", []))
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    print(f"⚠️ Could not read legacy learning log {path}: {e}")
+        return self._legacy_history
+    
+    def load_learning_history(self):
+        """Read all recorded learnings: legacy learning_log.json records, then the JSONL log"""
+        history = list(self._load_legacy_history())
+        try:
+            with open(self.learning_log_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        history.append(_json_loads(line))
+                    except ValueError:
+                        # Skip a partially written line (e.g. after a crash)
+                        continue
+        except FileNotFoundError:
+            pass
+        return history
 
 # Global instance
 tool_generator = ToolGenerator()
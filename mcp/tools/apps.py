@@ -1,6 +1,7 @@
 # mcp/tools/apps.py
 import subprocess
 import os
+import string
 
 # Common app name mappings
 APP_NAME_MAPPINGS = {
@@ -37,6 +38,20 @@ APP_NAME_MAPPINGS = {
     'code': 'Visual Studio Code'
 }
 
+# Filler words dropped from spoken app names, and punctuation stripping table
+APP_NAME_STOP_WORDS = frozenset({'the', 'app', 'application', 'please', 'open'})
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
 def normalize_app_name(name):
     """Normalize app name to proper application name"""
-    # Remove common words and clean up
\ No newline at end of file
+    # Remove common words and clean up
+    words = name.translate(_PUNCTUATION_TABLE).split()
+    cleaned = ' '.join(words).lower()
+    if cleaned in APP_NAME_MAPPINGS:
+        # Exact names that contain a filler word (e.g. "app store")
+        return APP_NAME_MAPPINGS[cleaned]
+    
+    words = [word for word in words if word.lower() not in APP_NAME_STOP_WORDS]
+    key = ' '.join(words).lower()
+    # Unknown apps keep the user's casing (e.g. "iMovie")
+    return APP_NAME_MAPPINGS.get(key, ' '.join(words))
@@ -1,24 +1,157 @@
 # mcp/tools/browser.py
 import subprocess
+import threading
+import atexit
 import re
+import os
+import selectors
+import time
 
-def open_url(url):
+# Matches URLs that already carry an http(s) scheme
+_URL_SCHEME_RE = re.compile(r"^https?://")
+
+def _launch(command, wait_for_errors=False):
+    """
+    Start a helper process without waiting for it (fire-and-forget).
+    With wait_for_errors, give it 200ms to fail and return its exit code.
+    """
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        close_fds=True
+    )
+    if wait_for_errors:
+        try:
+            return proc.wait(timeout=0.2)
+        except subprocess.TimeoutExpired:
+            pass
+    return 0
+
+# Long-lived interactive osascript shared by all browser actions (spawned on first use)
+_OSA_SENTINEL = "__chotu_osa_done__"
+# Longest wait for a statement's output before the REPL is considered hung
+_OSA_TIMEOUT_SECONDS = 10
+# osascript -i prints results as "=> value" and failures as "!! message", possibly after ">> " prompts
+_OSA_ERROR_LINE_RE = re.compile(r"^(?:>>\s*)*!!", re.M)
+# The REPL reads one statement per line, so a control character inside a quoted value
+# would end the statement early and run the rest as AppleScript
+_CONTROL_CHAR_RE = re.compile(r"[\x00-\x1f\x7f]")
+_osa_process = None
+_osa_lock = threading.Lock()
+
+def _applescript_string(value):
+    """Quote a Python string as an AppleScript string literal (single-line values only)"""
+    if _CONTROL_CHAR_RE.search(value):
+        raise ValueError("control characters cannot be sent to the osascript REPL")
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _close_osa():
+    global _osa_process
+    if _osa_process is not None and _osa_process.poll() is None:
+        _osa_process.stdin.close()
+        _osa_process.terminate()
+    _osa_process = None
+
+def _kill_osa():
+    """Kill a hung or broken REPL so the next call spawns a fresh one"""
+    global _osa_process
+    if _osa_process is not None:
+        _osa_process.kill()
+    _osa_process = None
+
+def _read_osa_output(timeout):
+    """Read REPL output up to the sentinel line, raising RuntimeError after timeout seconds"""
+    fd = _osa_process.stdout.fileno()
+    sentinel = _OSA_SENTINEL.encode()
+    deadline = time.monotonic() + timeout
+    buffer = b""
+    with selectors.DefaultSelector() as selector:
+        selector.register(fd, selectors.EVENT_READ)
+        while sentinel not in buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not selector.select(remaining):
+                raise RuntimeError("osascript timed out")
+            chunk = os.read(fd, 4096)
+            if not chunk:
+                raise RuntimeError("osascript exited unexpectedly")
+            buffer += chunk
+    # Drop the sentinel line and anything after it
+    output = buffer[:buffer.index(sentinel)]
+    return output[:output.rfind(b"\n") + 1].decode("utf-8", "replace")
+
+def _osa_exec(script):
+    """
+    Run an AppleScript statement in the persistent osascript REPL and return its output.
+    Saves a fork + exec of osascript/open per browser action.
+    """
+    global _osa_process
+    with _osa_lock:
+        if _osa_process is None or _osa_process.poll() is not None:
+            # Unbuffered bytes, so a select() on stdout never misses data held in a reader buffer
+            _osa_process = subprocess.Popen(
+                ["osascript", "-i"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0
+            )
+        
+        try:
+            # Follow the statement with a sentinel expression to delimit its output
+            _osa_process.stdin.write(
+                (script + "\n" + _applescript_string(_OSA_SENTINEL) + "\n").encode("utf-8")
+            )
+            return _read_osa_output(_OSA_TIMEOUT_SECONDS)
+        except (OSError, RuntimeError):
+            _kill_osa()
+            raise
+
+atexit.register(_close_osa)
+
+def _osa_open(script_template, values, fallback_command, wait_for_errors=False):
+    """
+    Run script_template, with values quoted into its {} fields, in the osascript pool.
+    Falls back to launching fallback_command (values as plain argv) when the pool fails
+    or a value contains control characters that the line-based REPL cannot carry.
+    """
+    try:
+        script = script_template.format(*(_applescript_string(value) for value in values))
+        output = _osa_exec(script)
+        return 1 if _OSA_ERROR_LINE_RE.search(output) else 0
+    except (OSError, RuntimeError, ValueError):
+        return _launch(fallback_command, wait_for_errors)
+
+def open_url(url, wait_for_errors=False):
     try:
         # Check if the URL is in the format of a website (e.g. apple.com)
-        if re.match(r"^(http|https)://", url):
-            subprocess.run(["open", url])
-            return "✅ URL opened successfully"
-        else:
+        if not _URL_SCHEME_RE.match(url):
             # Open the specified URL directly
-            subprocess.run(["open", "http://" + url])
-            return "✅ URL opened successfully"
+            url = "http://" + url
+        returncode = _osa_open(
+            "open location {}",
+            (url,),
+            ["open", url],
+            wait_for_errors
+        )
+        if returncode != 0:
+            return "❌ Error while opening URL: {}".format(url)
+        return "✅ URL opened successfully"
     except Exception as e:
         return "❌ Error while opening URL: {}".format(str(e))
 
-def open_browser(url, browser="Google Chrome"):
+def open_browser(url, browser="Google Chrome", wait_for_errors=False):
     try:
         # Open specified browser with the specified URL
-        subprocess.run(["open", "-a", browser, url])
+        returncode = _osa_open(
+            "tell application {0} to activate\n"
+            "tell application {0} to open location {1}",
+            (browser, url),
+            ["open", "-a", browser, url],
+            wait_for_errors
+        )
+        if returncode != 0:
+            return "❌ Error while opening browser: {}".format(browser)
         return "✅ Browser opened successfully"
     except Exception as e:
         return "❌ Error while opening browser: {}".format(str(e))
\ No newline at end of file
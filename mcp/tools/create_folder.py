@@ -13,7 +13,7 @@ def create_folder(folder_name):
         str: Success/error message
     """
     try:
-        os.mkdir(folder_name)
+        os.makedirs(folder_name, exist_ok=True)
         return f"✅ Success: Folder '{folder_name}' created"
     except Exception as e:
         return f"❌ Error: {e}"
\ No newline at end of file
@@ -8,12 +8,34 @@ Advanced YouTube automation with session management, popup handling, and video c
 import os
 import time
 import json
+import re
+import atexit
+import queue
+import threading
 import subprocess
 import random
 import socket
-import requests
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.common.action_chains import ActionChains
+    from selenium.common.exceptions import NoSuchElementException, TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+
+try:
+    import dns.resolver
+    DNSPYTHON_AVAILABLE = True
+except ImportError:
+    DNSPYTHON_AVAILABLE = False
 
 try:
     from .stealth_browser import create_stealth_driver, stealth_browser
@@ -36,39 +58,890 @@ except ImportError:
             STEALTH_AVAILABLE = False
             # Silently fail - stealth browser is optional
 
+# Connectivity probe caches: resolved hosts live for 5 minutes, a passing check for 1 minute
+_DNS_TTL_SECONDS = 300
+_NET_OK_SECONDS = 60
+_DNS_CACHE: Dict[str, Tuple[str, float]] = {}
+_NET_OK_UNTIL = 0.0
+
+# Reachability probe: a bare TCP connect to YouTube's HTTPS port, no TLS or payload
+_PROBE_HOST = 'www.youtube.com'
+_PROBE_PORT = 443
+_PROBE_TIMEOUT_SECONDS = 2
+
+# Public resolvers queried alongside the system resolver on a cache miss
+_PUBLIC_NAMESERVERS = ('1.1.1.1', '8.8.8.8')
+_DNS_TIMEOUT_SECONDS = 3
+_dns_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="dns-probe")
+
+def _resolve_system(host: str) -> str:
+    """Resolve through the OS resolver"""
+    return socket.getaddrinfo(host, 443, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+
+def _resolve_public(host: str, nameserver: str) -> str:
+    """Resolve through one public nameserver, bypassing the OS resolver"""
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = [nameserver]
+    return resolver.resolve(host, 'A', lifetime=_DNS_TIMEOUT_SECONDS)[0].to_text()
+
+def _resolve_replicated(host: str) -> str:
+    """Send the same lookup to several resolvers at once and take the first answer"""
+    futures = {_dns_executor.submit(_resolve_system, host)}
+    if DNSPYTHON_AVAILABLE:
+        futures.update(_dns_executor.submit(_resolve_public, host, ns) for ns in _PUBLIC_NAMESERVERS)
+    
+    last_error: Optional[Exception] = None
+    pending = futures
+    while pending:
+        done, pending = wait(pending, timeout=_DNS_TIMEOUT_SECONDS, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            try:
+                ip_address = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            for other in pending:
+                other.cancel()
+            return ip_address
+    
+    raise socket.gaierror(f"Could not resolve {host}: {last_error or 'timed out'}")
+
+# Live WebDriver session left running at exit, reattached by the next process
+_SESSION_FILE = os.path.expanduser("~/.chotu/yt_session.json")
+
+# Persistent profile and HTTP cache for the session browser, so relaunches keep
+# cookies, cached player bundles and YouTube's site storage
+_STEALTH_PROFILE_DIR = os.path.expanduser("~/Library/Application Support/Chotu/StealthChrome")
+_STEALTH_CACHE_DIR = os.path.expanduser("~/Library/Caches/Chotu/StealthChrome")
+
+# CHOTU_YT_HUMAN_TYPING=1 types search queries key by key with random delays;
+# otherwise the whole query is inserted in a single command
+_HUMAN_LIKE_TYPING = os.environ.get("CHOTU_YT_HUMAN_TYPING", "0") == "1"
+
+# Pause before relaunching a pooled browser that failed to start
+_POOL_RETRY_SECONDS = 5
+
+# Concurrent WebDriver commands (health monitor + popup checks) need more than one socket
+_COMMAND_POOL_MAXSIZE = 20
+
+def _widen_command_pool(driver, maxsize: int = _COMMAND_POOL_MAXSIZE):
+    """Let a driver's urllib3 pool to chromedriver hold several kept-alive connections"""
+    try:
+        executor = driver.command_executor
+        if hasattr(executor, 'keep_alive'):
+            executor.keep_alive = True
+        
+        pool_manager = executor._conn
+        pool_manager.connection_pool_kw['maxsize'] = maxsize
+        # Drop pools created with the old size; they are rebuilt lazily with the new one
+        pool_manager.clear()
+    except Exception as e:
+        print(f"⚠️ Could not resize WebDriver connection pool: {e}")
+
+# Desktop Chrome user agent; a random mobile one would land on m.youtube.com
+_DESKTOP_USER_AGENT = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+                       "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+_MOBILE_UA_PATTERN = re.compile(r"Mobi|Android|iPhone|iPad")
+
+# Anti-detection patches, registered once per browser so every new document runs them
+_STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+    delete navigator.__proto__.webdriver;
+    Object.defineProperty(navigator, 'plugins', {get: () => [1, 2, 3, 4, 5]});
+    Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+    Object.defineProperty(navigator, 'hardwareConcurrency', {get: () => 4});
+    window.chrome = {runtime: {}};
+    
+    if (navigator.permissions) {
+        const originalQuery = navigator.permissions.query.bind(navigator.permissions);
+        navigator.permissions.query = (parameters) => (
+            parameters.name === 'notifications' ?
+                Promise.resolve({state: Notification.permission}) :
+                originalQuery(parameters)
+        );
+    }
+    try {
+        Object.defineProperty(Notification, 'permission', {get: () => 'default'});
+    } catch (e) {}
+    
+    Object.defineProperty(screen, 'availHeight', {get: () => 900});
+    Object.defineProperty(screen, 'availWidth', {get: () => 1440});
+"""
+
+def _install_stealth_js(driver):
+    """Register _STEALTH_JS and the _PAGE_HELPERS_JS functions for every future document
+    of this browser (once per driver) and swap a mobile user agent for the desktop one"""
+    if getattr(driver, '_chotu_stealth_installed', False):
+        return
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _STEALTH_JS})
+        driver._chotu_stealth_installed = True
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _PAGE_HELPERS_JS})
+        # Keep YouTube on the desktop site instead of redirecting to m.youtube.com
+        if _MOBILE_UA_PATTERN.search(driver.execute_script("return navigator.userAgent") or ""):
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': _DESKTOP_USER_AGENT})
+    except Exception as e:
+        # Not a Chromium driver (e.g. a reattached Remote session, patched by its creator)
+        print(f"⚠️ Could not register stealth script: {e}")
+
+def _cached_resolve(host: str, ttl: float = _DNS_TTL_SECONDS) -> str:
+    """Resolve a hostname, reusing a recent answer instead of hitting DNS again"""
+    now = time.time()
+    cached = _DNS_CACHE.get(host)
+    if cached and now - cached[1] < ttl:
+        return cached[0]
+    
+    ip_address = _resolve_replicated(host)
+    _DNS_CACHE[host] = (ip_address, now)
+    return ip_address
+
+# Popup selectors, shared by every close_popups_and_ads call
+_CONSENT_SELECTORS = (
+    "button[aria-label*='Accept all']",
+    "button[aria-label*='I agree']",
+    "button[aria-label*='Accept']",
+    ".consent-button",
+    "[data-testid='accept-all-button']",
+)
+# Lowercase copy of the YouTube Music desktop promotion
+_MUSIC_TEXTS = (
+    "music discovery made easy",
+    "get youtube music",
+    "try youtube music",
+    "youtube music premium",
+    "youtube music web player",
+    "new releases, covers and hard-to-find songs",
+    "where music meets your desktop",
+    "our desktop experience was built",
+    "monthly paid subscription",
+)
+_MUSIC_CLOSE_SELECTORS = (
+    "button[aria-label*='No thanks']",
+    "button[aria-label*='Dismiss']",
+    "button[aria-label*='Close']",
+    "button[title*='Close']",
+    "button[title*='Dismiss']",
+    "[data-testid*='dismiss']",
+    "[data-testid*='close']",
+    ".dismiss-button",
+    ".close-button",
+)
+_MUSIC_POPUP_CONTAINERS = (
+    "ytd-popup-container",
+    "tp-yt-paper-dialog",
+    "[role='dialog']",
+    "ytmusic-promotion-dialog-renderer",
+    "yt-mealbar-promo-renderer",
+)
+_OVERLAY_SELECTORS = (
+    "[role='dialog']",
+    ".popup-container",
+    ".modal-container",
+    ".overlay",
+    "[class*='popup']",
+    "[class*='modal']",
+    "[class*='overlay']",
+    "[class*='dialog']",
+)
+_OVERLAY_CLOSE_SELECTORS = (
+    "button[aria-label*='Close']",
+    "button[aria-label*='Dismiss']",
+    ".close-button",
+)
+
+# Button labels that dismiss a promotion dialog
+_DISMISS_WORDS = ("no thanks", "dismiss", "close")
+
+def _js_vars(**constants) -> str:
+    """Declare Python constants as JS variables at the top of an injected script"""
+    return "".join(f"    var {name} = {json.dumps(value)};\n" for name, value in constants.items())
+
+def _keyword_pattern(words) -> str:
+    """One alternation matching any of the literal words, usable as a Python or JS regex"""
+    return "|".join(re.escape(word) for word in words)
+
+# Drops elements hidden by attribute or inline style inside the selector engine,
+# so they never cross the wire to be rejected by a visibility check
+_NOT_HIDDEN = ":not([hidden]):not([aria-hidden='true']):not([style*='display: none']):not([style*='display:none'])"
+
+def _not_hidden(selectors) -> str:
+    """Join selectors into one, each restricted to elements that are not hidden"""
+    return ", ".join(selector + _NOT_HIDDEN for selector in selectors)
+
+# YouTube's own app pages (watch, browse/search) render every popup through these
+# hosts; the class-substring overlay scan above would mostly hit player chrome there
+_APP_DIALOG_SELECTORS = (
+    "ytd-popup-container [role='dialog']",
+    "tp-yt-paper-dialog",
+    "ytd-consent-bump-v2-lightbox",
+    "yt-mealbar-promo-renderer",
+    "ytmusic-promotion-dialog-renderer",
+)
+
+# Consent banners, the YouTube Music desktop promotion and generic dialogs,
+# probed and dismissed in one execute_script round-trip
+_POPUP_KILLER_BODY = """
+    var closed = 0;
+    var musicClosed = false;
+    var dismissed = arguments[0] || {};
+    var MUSIC_RE = new RegExp(MUSIC_PATTERN, 'i');
+    var DISMISS_RE = new RegExp(DISMISS_PATTERN, 'i');
+
+    function visible(el) { return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length); }
+    function label(el) {
+        return (el.textContent || '') + ' ' + (el.getAttribute('aria-label') || '');
+    }
+    function mentions(root, pattern) {
+        // Text node by text node, stopping at the first hit, instead of building root.textContent
+        var walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+        for (var node = walker.nextNode(); node; node = walker.nextNode()) {
+            if (pattern.test(node.nodeValue)) return true;
+        }
+        return false;
+    }
+    function clickFirstVisible(selectors, root) {
+        for (var i = 0; i < selectors.length; i++) {
+            var elements = (root || document).querySelectorAll(selectors[i]);
+            for (var j = 0; j < elements.length; j++) {
+                if (visible(elements[j])) { elements[j].click(); closed++; break; }
+            }
+        }
+    }
+    function clickDismiss(container, pattern) {
+        var buttons = container.querySelectorAll("button, [role='button']");
+        for (var i = 0; i < buttons.length; i++) {
+            if (visible(buttons[i]) && pattern.test(label(buttons[i]))) {
+                buttons[i].click(); closed++;
+                return true;
+            }
+        }
+        return false;
+    }
+
+    // (1) consent/cookie banners
+    clickFirstVisible(CONSENT);
+
+    // (2) YouTube Music promotion, recognised by its copy inside one of
+    // YouTube's popup renderers, and (4) its "No thanks"/"Dismiss" button.
+    // Walked backwards so a nested dialog is tried before its wrapper.
+    // Skipped once dismissed: the promotion is shown at most once per session.
+    var handled = [];
+    var containers = dismissed.music ? [] : document.querySelectorAll(PROMO_CONTAINERS);
+    for (var i = containers.length - 1; i >= 0; i--) {
+        var container = containers[i];
+        if (handled.some(function(done) { return container.contains(done); })) continue;
+        if (!visible(container) || !mentions(container, MUSIC_RE)) continue;
+        if (clickDismiss(container, DISMISS_RE)) handled.push(container);
+    }
+    musicClosed = handled.length > 0;
+    clickFirstVisible(CLOSE);
+
+    // (3) any other visible dialog/overlay exposing a close button
+    var overlays = document.querySelectorAll(DIALOGS);
+    for (var k = 0; k < overlays.length; k++) {
+        if (handled.indexOf(overlays[k]) === -1 && visible(overlays[k])) {
+            clickFirstVisible(OVERLAY_CLOSE, overlays[k]);
+        }
+    }
+
+    // Last resort: a stray "No thanks" button anywhere on the page
+    clickDismiss(document, /no thanks/i);
+
+    return {closed: closed, music: musicClosed};
+"""
+
+def _build_popup_js(dialog_selectors) -> str:
+    """Bake one surface's dialog selectors (and the shared lists) into the popup closer"""
+    return _js_vars(
+        CONSENT=_CONSENT_SELECTORS,
+        MUSIC_PATTERN=_keyword_pattern(_MUSIC_TEXTS),
+        DISMISS_PATTERN=_keyword_pattern(_DISMISS_WORDS),
+        CLOSE=_MUSIC_CLOSE_SELECTORS,
+        OVERLAY_CLOSE=_OVERLAY_CLOSE_SELECTORS,
+        DIALOGS=", ".join(dialog_selectors),
+        PROMO_CONTAINERS=", ".join(_MUSIC_POPUP_CONTAINERS),
+    ) + _POPUP_KILLER_BODY
+
+_POPUP_KILLER_JS = _build_popup_js(_OVERLAY_SELECTORS)
+_POPUP_JS_APP = _build_popup_js(_APP_DIALOG_SELECTORS)
+# Page surface (as reported by _POPUP_DIRTY_JS) -> tailored closer; anything
+# else, e.g. the consent.youtube.com interstitial, gets the generic one
+_POPUP_JS_BY_SURFACE = {
+    'watch': _POPUP_JS_APP,
+    'browse': _POPUP_JS_APP,
+}
+
+# Buttons closing premium/notification prompts and overlay ads, and skipping video ads
+_PREMIUM_SELECTORS = (
+    "button[aria-label*='No thanks']",
+    "button[aria-label*='Not now']",
+    "button[aria-label*='Skip trial']",
+    "button[aria-label*='Dismiss']",
+    ".dismiss-button",
+    ".ytd-popup-container button[aria-label*='Close']",
+)
+_NOTIFICATION_SELECTORS = (
+    "button[aria-label*='Turn on notifications']",
+    "button[aria-label*='Allow notifications']",
+    "button[aria-label*='Block']",
+    "button[aria-label*=\"Don't allow\"]",
+    ".notification-popup button",
+)
+_AD_OVERLAY_SELECTORS = (
+    ".ytp-ad-overlay-close-button",
+    ".ytp-ad-overlay-close-container button",
+    "button[aria-label*='Close ad']",
+    ".ad-overlay-close-button",
+)
+_SKIP_AD_SELECTORS = (
+    ".ytp-ad-skip-button",
+    ".ytp-skip-ad-button",
+    "button[aria-label*='skip ad' i]",
+)
+
+# Clicks the first visible match of each group with one querySelectorAll per
+# group and reports which groups it handled
+_POPUP_BUTTON_GROUPS = {
+    'premium': ", ".join(_PREMIUM_SELECTORS),
+    'notifications': ", ".join(_NOTIFICATION_SELECTORS),
+    'overlay_ad': ", ".join(_AD_OVERLAY_SELECTORS),
+}
+_POPUP_BUTTONS_JS = _js_vars(
+    GROUPS=_POPUP_BUTTON_GROUPS,
+    SKIP=", ".join(_SKIP_AD_SELECTORS),
+) + """
+    var dismissed = arguments[0] || {};
+    var result = {};
+    for (var name in GROUPS) {
+        result[name] = false;
+        if (dismissed[name]) continue;
+        var elements = document.querySelectorAll(GROUPS[name]);
+        for (var i = 0; i < elements.length; i++) {
+            if (elements[i].offsetParent !== null) {
+                elements[i].click();
+                result[name] = true;
+                break;
+            }
+        }
+    }
+    
+    // Safety check - make sure it's actually an enabled skip button
+    result.skipped = false;
+    var skips = document.querySelectorAll(SKIP);
+    for (var j = 0; j < skips.length; j++) {
+        var button = skips[j];
+        var label = ((button.textContent || '') + ' ' + (button.getAttribute('aria-label') || '')).toLowerCase();
+        if (button.offsetParent !== null && !button.disabled && label.indexOf('skip') !== -1) {
+            button.click();
+            result.skipped = true;
+            break;
+        }
+    }
+    return result;
+"""
+
+# Skip buttons the in-page observer may click on its own: YouTube's skip classes,
+# plus skip-labelled buttons only inside the ad container
+_AUTO_SKIP_SELECTORS = (
+    ".ytp-ad-skip-button",
+    ".ytp-ad-skip-button-modern",
+    ".ytp-skip-ad-button",
+    ".video-ads button[aria-label*='skip' i]",
+)
+
+# Installs, once per document, a MutationObserver that clicks a skip button as soon
+# as one is shown, and returns how many it has clicked in this document
+_SKIP_OBSERVER_JS = _js_vars(SKIP=", ".join(_AUTO_SKIP_SELECTORS)) + """
+    if (window.__chotuSkipClicks === undefined) {
+        window.__chotuSkipClicks = 0;
+        var pending = false;
+        var clickSkip = function() {
+            pending = false;
+            var buttons = document.querySelectorAll(SKIP);
+            for (var i = 0; i < buttons.length; i++) {
+                var button = buttons[i];
+                if (button.offsetParent !== null && !button.disabled && !button.__chotuClicked) {
+                    button.__chotuClicked = true;
+                    button.click();
+                    window.__chotuSkipClicks++;
+                    return;
+                }
+            }
+        };
+        // Coalesce mutation bursts into one check per frame
+        new MutationObserver(function() {
+            if (!pending) {
+                pending = true;
+                requestAnimationFrame(clickSkip);
+            }
+        }).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, attributeFilter: ['class', 'style', 'hidden']
+        });
+        clickSkip();
+    }
+    return window.__chotuSkipClicks;
+"""
+
+def _chain_scripts(**bodies) -> str:
+    """Run several script bodies in one execute_script, each seeing the same arguments;
+    the combined script returns {name: that body's result}"""
+    chained = "".join(
+        f"    results.{name} = (function() {{\n{body}\n    }}).apply(null, arguments);\n"
+        for name, body in bodies.items()
+    )
+    return "    var results = {};\n" + chained + "    return results;\n"
+
+# Popup closer and button batch fused, so one round-trip reports everything handled
+_CLOSE_ALL_JS = _chain_scripts(popups=_POPUP_KILLER_JS, buttons=_POPUP_BUTTONS_JS)
+_CLOSE_ALL_JS_BY_SURFACE = {
+    surface: _chain_scripts(popups=popup_js, buttons=_POPUP_BUTTONS_JS)
+    for surface, popup_js in _POPUP_JS_BY_SURFACE.items()
+}
+
+# Cheap probe run before the ad-skip scan. The player keeps empty .video-ads /
+# .ytp-ad-module containers between ads, so only populated ones count
+_AD_PRESENT_JS = """
+    return !!document.querySelector(
+        '.ad-showing, .ytp-ad-module:not(:empty), .video-ads:not(:empty), ' +
+        '.ytp-ad-text, .ytp-ad-skip-button, .ytp-skip-ad-button');
+"""
+
+# Every skip-button variation the ad-skip rounds look for
+_SKIP_BUTTON_SELECTORS = (
+    # Standard YouTube skip buttons
+    ".ytp-ad-skip-button",
+    ".ytp-skip-ad-button",
+    ".ytp-ad-skip-button-modern",
+    ".ytp-ad-skip-button-text",
+    ".ytp-ad-skip-button-container button",
+
+    # Aria label based (most reliable); the i flag covers every capitalisation
+    "button[aria-label*='skip' i]",
+    "[role='button'][aria-label*='skip' i]",
+
+    # Class name based (also covers .skip-button and button[class*='skip-button'])
+    "[class*='skip'][class*='button']",
+    "button[class*='ytp-ad-skip']",
+    "[class*='ad-skip']",
+
+    # Generic approaches
+    "[data-testid*='skip' i]",
+    "button[id*='skip' i]",
+
+    # Container searches
+    ".video-ads button",
+    ".ytp-ad-module button",
+    ".ad-container button",
+)
+_SKIP_BUTTON_CSS = _not_hidden(_SKIP_BUTTON_SELECTORS)
+# Text-matched skip buttons (what jQuery's :contains('Skip Ad') used to express)
+_SKIP_TEXT_BUTTON_JS = """
+    return Array.from(document.querySelectorAll("button, [role='button']")).find(function(button) {
+        return button.offsetParent !== null && /skip\\s*ad/i.test(button.textContent || '');
+    }) || null;
+"""
+# Standard and aria-label variants, retried while an ad countdown runs
+_SKIP_BUTTON_PRIORITY_CSS = _not_hidden(_SKIP_BUTTON_SELECTORS[:5] + ("button[aria-label*='skip ad' i]",))
+_AD_COUNTDOWN_CSS = _not_hidden((
+    ".ytp-ad-duration-remaining",
+    ".ytp-ad-text",
+    "[class*='countdown']",
+    "[class*='timer']",
+))
+
+def _is_skip_button(text: str, aria: str, cls: str) -> bool:
+    """Whether a candidate's lowercased text, aria-label and class mark a real ad skip button"""
+    text_has_skip = "skip" in text
+    aria_has_skip = "skip" in aria
+    cls_has_skip = "skip" in cls
+    return (
+        (text_has_skip and ("ad" in text or len(text) < 15)) or
+        (aria_has_skip and "ad" in aria) or
+        (cls_has_skip and ("ad" in cls or "ytp" in cls))
+    )
+
+# Fallback skip detection: standard buttons, then a scan of every button-like
+# element, then any visible button inside an ad container
+_AD_SKIP_SCAN_JS = """
+    console.log('Starting comprehensive ad skip detection...');
+
+    // Function to click element safely
+    function safeClick(element) {
+        try {
+            element.scrollIntoView({block: 'center'});
+            setTimeout(() => {
+                element.click();
+                console.log('Successfully clicked skip button');
+            }, 100);
+            return true;
+        } catch (e) {
+            console.log('Click failed:', e);
+            return false;
+        }
+    }
+
+    // Method 1: Look for YouTube's standard skip buttons
+    var standardSelectors = [
+        '.ytp-ad-skip-button',
+        '.ytp-skip-ad-button',
+        '.ytp-ad-skip-button-modern'
+    ];
+
+    for (var sel of standardSelectors) {
+        var btns = document.querySelectorAll(sel);
+        for (var btn of btns) {
+            if (btn.offsetParent !== null) { // Check if visible
+                console.log('Found standard skip button:', sel);
+                if (safeClick(btn)) return true;
+            }
+        }
+    }
+
+    // Method 2: Comprehensive button scanning
+    var allButtons = document.querySelectorAll('button, [role="button"], [class*="button"]');
+
+    for (var btn of allButtons) {
+        if (btn.offsetParent === null) continue; // Skip hidden elements
+
+        var text = (btn.textContent || btn.innerText || '').toLowerCase().trim();
+        var ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
+        var className = (btn.className || '').toLowerCase();
+
+        // Check for skip ad indicators
+        var isSkipButton = (
+            (text.includes('skip') && (text.includes('ad') || text.length < 15)) ||
+            (ariaLabel.includes('skip') && ariaLabel.includes('ad')) ||
+            (className.includes('skip') && (className.includes('ad') || className.includes('ytp')))
+        );
+
+        if (isSkipButton) {
+            console.log('Found skip button via comprehensive scan:', text || ariaLabel || className);
+            if (safeClick(btn)) return true;
+        }
+    }
+
+    // Method 3: Look for ad containers and find skip buttons within
+    var adContainers = document.querySelectorAll('.ytp-ad-module, .video-ads, [class*="ad-"], .ytp-ad-text');
+    for (var container of adContainers) {
+        var buttons = container.querySelectorAll('button, [role="button"]');
+        for (var btn of buttons) {
+            if (btn.offsetParent !== null) {
+                console.log('Found button in ad container, trying click...');
+                if (safeClick(btn)) return true;
+            }
+        }
+    }
+
+    console.log('No skip buttons found');
+    return false;
+"""
+
+# Pause controls tried in order when the media-element pause is unavailable
+_PAUSE_BUTTON_SELECTORS = (
+    ".ytp-play-button[aria-label*='Pause']",
+    ".ytp-play-button[title*='Pause']",
+    "button[aria-label*='Pause']",
+)
+
+# Every search box variant, polled together by a single wait
+_SEARCH_BOX_CSS = ", ".join((
+    "input[name='search_query']",
+    "#search-input input",
+    "input[placeholder*='Search']",
+    "ytd-searchbox input",
+    "#searchbox input",
+))
+
+# Search-result video links, matched in a single query
+_VIDEO_LINK_CSS = ", ".join((
+    "a#video-title",
+    "ytd-video-renderer a#video-title",
+    "a[href*='/watch?v=']",
+    ".ytd-video-renderer .ytd-thumbnail a",
+))
+
+# Visible search-result links with a usable title (title attribute, else rendered
+# text), in document order, as [{element, title, href}] from a single call
+_VIDEO_LINKS_JS = _js_vars(SELECTOR=_VIDEO_LINK_CSS) + """
+    var links = [];
+    document.querySelectorAll(SELECTOR).forEach(function(link) {
+        if (link.offsetParent === null) return;
+        var title = (link.getAttribute('title') || link.innerText || '').trim();
+        if (title.length > 5) {  // Skip empty or very short titles
+            links.push({element: link, title: title, href: link.href});
+        }
+    });
+    return links;
+"""
+
+# Whether any element matching arguments[0] is still rendered
+_ANY_VISIBLE_JS = """
+    var elements = document.querySelectorAll(arguments[0]);
+    for (var i = 0; i < elements.length; i++) {
+        if (elements[i].offsetParent !== null) return true;
+    }
+    return false;
+"""
+# Dialog hosts watched for disappearance after the popup closer clicks something
+_DIALOG_CSS = ", ".join(("[role='dialog']",) + _APP_DIALOG_SELECTORS)
+_STANDARD_SKIP_CSS = ".ytp-ad-skip-button, .ytp-skip-ad-button"
+
+# Polled after opening a video: 'ad' while a skip button is shown, 'playing' once the
+# main video (not an ad) is running, false otherwise
+_AD_OR_PLAYING_JS = _js_vars(SKIP=_STANDARD_SKIP_CSS + ", .ytp-ad-skip-button-modern") + """
+    var skips = document.querySelectorAll(SKIP);
+    for (var i = 0; i < skips.length; i++) {
+        if (skips[i].offsetParent !== null) return 'ad';
+    }
+    var video = document.querySelector('video');
+    if (video && !video.paused && video.currentTime > 0 && !document.querySelector('.ad-showing')) {
+        return 'playing';
+    }
+    return false;
+"""
+# Polled functions defined once per document, so each poll sends and parses a
+# one-line call instead of the whole script
+_PAGE_HELPERS_JS = "window.__chotuAdState = function() {\n" + _AD_OR_PLAYING_JS + "};\n"
+# None when the helpers are not defined in this document (e.g. a non-Chromium driver)
+_AD_STATE_CALL_JS = "return window.__chotuAdState ? window.__chotuAdState() : null;"
+# Upper bound on waiting for playback to start (ads included)
+_AD_WAIT_SECONDS = 15
+# WebDriver's default async script timeout, restored when the driver can't report its own
+_DEFAULT_SCRIPT_TIMEOUT_SECONDS = 30
+
+# Element handles plus the properties the ad-skip checks read, for every match of
+# arguments[0]; replaces per-element is_displayed/is_enabled/text/get_attribute calls
+_ELEMENT_INFO_JS = """
+    return Array.from(document.querySelectorAll(arguments[0])).map(function(e) {
+        return {
+            element: e,
+            visible: e.offsetParent !== null,
+            enabled: !e.disabled,
+            text: (e.innerText || '').toLowerCase().trim(),
+            aria: (e.getAttribute('aria-label') || '').toLowerCase().trim(),
+            cls: (typeof e.className === 'string' ? e.className : '').toLowerCase()
+        };
+    });
+"""
+
+# Critical errors only (not general page errors), pre-lowercased for matching
+_CRITICAL_ERRORS_LC = tuple(s.lower() for s in (
+    "This video is unavailable",
+    "Video unavailable",
+    "Please try again later",
+))
+
+# Samples playback once a second inside the page and resolves as soon as the
+# video stops or a critical error shows, or when the window (arguments[0] s) ends
+_HEALTH_WATCH_JS = _js_vars(CRITICAL_PATTERN=_keyword_pattern(_CRITICAL_ERRORS_LC)) + """
+    var CRITICAL_RE = new RegExp(CRITICAL_PATTERN, 'i');
+    var deadline = Date.now() + arguments[0] * 1000;
+    var done = arguments[arguments.length - 1];
+    var some = Array.prototype.some;
+    
+    function sample() {
+        var playing = some.call(document.querySelectorAll('video'), function(video) {
+            return !video.paused && video.currentTime > 0;
+        });
+        var errors = document.querySelectorAll(".ytp-error, .error-screen, [class*='error'], [id*='error']");
+        var error = some.call(errors, function(el) {
+            return el.offsetParent !== null && CRITICAL_RE.test(el.textContent || '');
+        });
+        return {playing: playing, error: error, t: Date.now()};
+    }
+    
+    clearInterval(window.__chotuHealthTimer);
+    function tick() {
+        var health = window.__chotuHealth = sample();
+        if (!health.playing || health.error || health.t >= deadline) {
+            clearInterval(window.__chotuHealthTimer);
+            done(health);
+        }
+    }
+    window.__chotuHealthTimer = setInterval(tick, 1000);
+    tick();
+"""
+
+# Consumes the "dialog-like node appeared" flag kept by a MutationObserver and
+# reports which YouTube surface is showing. The observer is installed on first
+# use in each document, which reports dirty since nothing has been observed there yet.
+# Only real dialog hosts count: tag/class substrings such as "overlay" also match
+# thumbnail renderers (ytd-thumbnail-overlay-*) that stream in with every feed page
+_POPUP_DIRTY_JS = _js_vars(DIALOG=_DIALOG_CSS) + """
+    var surface = !document.querySelector('ytd-app') ? 'other'
+                : location.pathname === '/watch' ? 'watch' : 'browse';
+    if (window.__chotuPopupDirty === undefined) {
+        // Shown/hidden toggles count on the dialog itself; inserted subtrees may carry one inside
+        var isAddedPopup = function(node) {
+            return node.nodeType === 1 && (node.matches(DIALOG) || !!node.querySelector(DIALOG));
+        };
+        new MutationObserver(function(mutations) {
+            for (var i = 0; i < mutations.length; i++) {
+                var mutation = mutations[i];
+                if (mutation.type === 'attributes' ? mutation.target.matches(DIALOG)
+                                                   : Array.prototype.some.call(mutation.addedNodes, isAddedPopup)) {
+                    window.__chotuPopupDirty = true;
+                    return;
+                }
+            }
+        }).observe(document.documentElement, {
+            childList: true, subtree: true, attributes: true, attributeFilter: ['hidden', 'style']
+        });
+        window.__chotuPopupDirty = false;
+        return {dirty: true, surface: surface};
+    }
+    var dirty = window.__chotuPopupDirty;
+    window.__chotuPopupDirty = false;
+    return {dirty: dirty, surface: surface};
+"""
+
+class StealthDriverPool:
+    """Bounded pool of pre-warmed stealth Chrome drivers, recycled after max_uses leases"""
+    
+    def __init__(self, size: int = 2, max_uses: int = 50, headless: bool = False):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self._idle: "queue.Queue" = queue.Queue(maxsize=size)
+        self._use_counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        
+        # Drivers are launched by a background thread so neither construction nor
+        # recycling blocks callers; acquire() waits only while the pool is empty
+        self._refill_requests: "queue.Queue" = queue.Queue()
+        for _ in range(size):
+            self._refill_requests.put(True)
+        self._refiller = threading.Thread(target=self._refill_loop, name="stealth-pool-refill", daemon=True)
+        self._refiller.start()
+        
+        # Pre-warmed browsers are visible Chrome windows; don't leave them behind at exit
+        atexit.register(self.close)
+    
+    def _launch_driver(self):
+        from stealth_browser import StealthBrowser
+        return StealthBrowser().get_stealth_driver(headless=self.headless)
+    
+    def _refill_loop(self):
+        while self._refill_requests.get():
+            if self._closed:
+                return
+            try:
+                driver = self._launch_driver()
+            except Exception as e:
+                print(f"⚠️ Could not pre-warm stealth browser: {e}")
+                driver = None
+            if not driver:
+                # Retry later rather than leave the pool permanently one driver short
+                time.sleep(_POOL_RETRY_SECONDS)
+                self._refill_requests.put(True)
+                continue
+            _widen_command_pool(driver)
+            _install_stealth_js(driver)
+            with self._lock:
+                self._use_counts[id(driver)] = 0
+            self._idle.put(driver)
+    
+    def acquire(self, timeout: float = 30.0):
+        """Take an idle driver, waiting up to timeout seconds (raises queue.Empty)"""
+        return self._idle.get(timeout=timeout)
+    
+    def release(self, driver, failed: bool = False):
+        """Return a driver; it is quit and replaced when it failed or hit max_uses"""
+        with self._lock:
+            owned = id(driver) in self._use_counts
+            if owned:
+                uses = self._use_counts[id(driver)] + 1
+                self._use_counts[id(driver)] = uses
+        
+        if not owned:
+            # Not launched by this pool (e.g. a reattached session): never queue it
+            self._retire(driver)
+            return
+        
+        if failed or uses >= self.max_uses or self._closed:
+            self._retire(driver)
+            if not self._closed:
+                self._refill_requests.put(True)
+        else:
+            try:
+                self._idle.put_nowait(driver)
+            except queue.Full:
+                self._retire(driver)
+    
+    def _retire(self, driver):
+        with self._lock:
+            self._use_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    @contextmanager
+    def lease(self, timeout: float = 30.0):
+        """Context manager that acquires a driver and always releases it"""
+        driver = self.acquire(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, failed)
+    
+    def close(self):
+        """Quit every idle driver and stop refilling"""
+        self._closed = True
+        self._refill_requests.put(False)
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
 class YouTubeSessionManager:
     """Manages persistent YouTube browser sessions"""
     
-    def __init__(self):
+    def __init__(self, driver_pool: Optional[StealthDriverPool] = None):
+        self.driver_pool = driver_pool
         self.active_driver = None
         self.youtube_tab = None
         self.session_active = False
         self.last_query = None
         self.current_video_url = None
+        
+        # Leave the browser running at exit so the next process can reattach to it
+        atexit.register(self.persist_session)
     
     def check_network_connectivity(self) -> bool:
-        """Check network connectivity to YouTube"""
+        """Check network connectivity to YouTube (a passing result is reused for a minute)"""
+        global _NET_OK_UNTIL
+        
+        if time.time() < _NET_OK_UNTIL:
+            return True
+        
         try:
             print("🔌 Checking network connectivity...")
             
             # Check DNS resolution
             try:
-                socket.gethostbyname('www.youtube.com')
+                ip_address = _cached_resolve(_PROBE_HOST)
                 print("✅ DNS resolution successful")
             except socket.gaierror as e:
                 print(f"❌ DNS resolution failed: {e}")
                 return False
             
-            # Check HTTP connectivity
+            # Check YouTube is reachable (one round-trip to the address just resolved)
             try:
-                response = requests.get('https://www.google.com', timeout=10)
-                if response.status_code == 200:
-                    print("✅ Internet connectivity confirmed")
-                    return True
-                else:
-                    print(f"❌ HTTP check failed with status: {response.status_code}")
-                    return False
-            except requests.RequestException as e:
+                with socket.create_connection((ip_address, _PROBE_PORT), timeout=_PROBE_TIMEOUT_SECONDS):
+                    pass
+                print("✅ Internet connectivity confirmed")
+                _NET_OK_UNTIL = time.time() + _NET_OK_SECONDS
+                return True
+            except OSError as e:
                 print(f"❌ Network connectivity test failed: {e}")
                 return False
                 
@@ -88,9 +961,78 @@ class YouTubeSessionManager:
                 # Driver is dead, clean up
                 self.cleanup_session()
         
+        # Reattach to a browser left running by a previous process (pooled sessions
+        # are never persisted, so there is nothing to reattach to with a pool)
+        if not self.driver_pool:
+            driver = self._attach_persisted_session()
+            if driver:
+                return driver
+        
         # Create new session
         return self.create_new_session()
     
+    def _attach_persisted_session(self):
+        """Attach to the WebDriver session saved by persist_session, if it is still alive"""
+        try:
+            with open(_SESSION_FILE, 'r') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        try:
+            from selenium import webdriver
+            
+            # A Remote driver that attaches instead of starting a new browser session;
+            # the override stays on this subclass so concurrently built drivers are untouched
+            class _Attached(webdriver.Remote):
+                def start_session(self, *args, **kwargs):
+                    pass
+            
+            driver = _Attached(command_executor=saved['executor_url'], options=webdriver.ChromeOptions())
+            
+            driver.session_id = saved['session_id']
+            _widen_command_pool(driver)
+            driver.current_url  # Raises if the saved session is gone
+            
+            self.active_driver = driver
+            self.session_active = True
+            print("♻️ Reattached to existing YouTube browser session")
+            return driver
+            
+        except Exception as e:
+            print(f"⚠️ Saved browser session unavailable, starting fresh: {e}")
+            self._forget_persisted_session()
+            return None
+    
+    def _forget_persisted_session(self):
+        """Remove the saved session file"""
+        try:
+            os.remove(_SESSION_FILE)
+        except OSError:
+            pass
+    
+    def persist_session(self):
+        """Save the live session for reuse and detach without quitting the browser"""
+        driver = self.active_driver
+        if not driver or not self.session_active or self.driver_pool:
+            return
+        
+        try:
+            os.makedirs(os.path.dirname(_SESSION_FILE), exist_ok=True)
+            with open(_SESSION_FILE, 'w') as f:
+                json.dump({
+                    "executor_url": driver.command_executor._url,
+                    "session_id": driver.session_id
+                }, f)
+            
+            # Stop driver/service teardown (including __del__) from killing the browser
+            driver.quit = lambda: None
+            service = getattr(driver, 'service', None)
+            if service is not None:
+                service.stop = lambda: None
+        except Exception as e:
+            print(f"⚠️ Could not persist browser session: {e}")
+    
     def create_new_session(self):
         """Create a new browser session using ONLY stealth browser"""
         try:
@@ -100,13 +1042,26 @@ class YouTubeSessionManager:
             if not STEALTH_AVAILABLE:
                 raise Exception("Stealth browser not available. Please install: pip install undetected-chromedriver")
             
+            # Take a pre-warmed browser when a pool is configured
+            if self.driver_pool:
+                self.active_driver = self.driver_pool.acquire()
+                self.session_active = True
+                print("✅ Stealth browser session taken from warm pool")
+                return self.active_driver
+            
             # Use ONLY stealth browser
             from stealth_browser import StealthBrowser
             stealth = StealthBrowser()
-            self.active_driver = stealth.get_stealth_driver(headless=False)
+            self.active_driver = stealth.get_stealth_driver(
+                headless=False,
+                user_data_dir=_STEALTH_PROFILE_DIR,
+                disk_cache_dir=_STEALTH_CACHE_DIR
+            )
             
             if not self.active_driver:
                 raise Exception("Failed to create stealth browser")
+            _widen_command_pool(self.active_driver)
+            _install_stealth_js(self.active_driver)
             
             self.session_active = True
             print("✅ Stealth browser session created successfully")
@@ -149,7 +1104,7 @@ class YouTubeSessionManager:
             options.add_argument("--remote-debugging-port=9222")  # For session reuse
             
             # YouTube-specific optimizations
-            options.add_argument("--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+            options.add_argument(f"--user-agent={_DESKTOP_USER_AGENT}")
             
             # Preferences for better YouTube experience
             prefs = {
@@ -169,38 +1124,10 @@ class YouTubeSessionManager:
             
             service = Service()
             self.active_driver = webdriver.Chrome(service=service, options=options)
+            _widen_command_pool(self.active_driver)
             
-            # Execute comprehensive anti-detection script
-            self.active_driver.execute_script("""
-                // Remove webdriver property
-                Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
-                
-                // Mock plugins and languages
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5]
-                });
-                
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en']
-                });
-                
-                // Mock chrome object
-                window.chrome = {
-                    runtime: {}
-                };
-                
-                // Override permissions API
-                const originalQuery = window.navigator.permissions.query;
-                window.navigator.permissions.query = (parameters) => (
-                    parameters.name === 'notifications' ?
-                        Promise.resolve({ state: Notification.permission }) :
-                        originalQuery(parameters)
-                );
-                
-                // Randomize screen properties
-                Object.defineProperty(screen, 'availHeight', {get: () => 900});
-                Object.defineProperty(screen, 'availWidth', {get: () => 1440});
-            """)
+            # Anti-detection patches for every page this browser loads
+            _install_stealth_js(self.active_driver)
             
             self.session_active = True
             
@@ -213,12 +1140,23 @@ class YouTubeSessionManager:
     
     def cleanup_session(self):
         """Clean up browser session"""
-        if self.active_driver:
+        if self.active_driver and self.driver_pool:
+            # Hand the browser back; the pool recycles it if it is dead or worn out
+            try:
+                self.active_driver.current_url
+                alive = True
+            except:
+                alive = False
+            self.driver_pool.release(self.active_driver, failed=not alive)
+        elif self.active_driver:
             try:
                 self.active_driver.quit()
             except:
                 pass
         
+        # A closed session must not be reattached by the next process
+        self._forget_persisted_session()
+        
         self.active_driver = None
         self.youtube_tab = None
         self.session_active = False
@@ -230,57 +1168,64 @@ class YouTubeVideoController:
     def __init__(self, driver, wait):
         self.driver = driver
         self.wait = wait
+        self.page_surface = 'other'  # 'watch', 'browse' or 'other'; refreshed by each popup check
+        self._last_refresh_time = 0.0
+        self._last_popup_cleanup = 0.0
+        # One-time prompts already dismissed in this browser session; their checks are skipped
+        self._popup_dismissed_state = {'music': False, 'premium': False, 'notifications': False}
+        self._ad_skip_clicks = 0  # skip clicks already reported from the in-page observer
     
     def stop_current_video(self) -> bool:
         """Stop currently playing video"""
         try:
             print("⏹️ Stopping current video...")
             
-            # Method 1: Try to pause using keyboard shortcut
-            from selenium.webdriver.common.keys import Keys
-            from selenium.webdriver.common.action_chains import ActionChains
+            # Method 1: JavaScript pause - one round-trip, no focus needed
+            try:
+                paused_count = self.driver.execute_script("""
+                    var videos = document.querySelectorAll('video');
+                    if (!videos.length) return -1;
+                    var paused = 0;
+                    for (var i = 0; i < videos.length; i++) {
+                        if (!videos[i].paused) {
+                            videos[i].pause();
+                            paused++;
+                        }
+                    }
+                    return paused;
+                """)
+                if paused_count > 0:
+                    print("✅ Video paused using JavaScript")
+                    return True
+                if paused_count == 0:
+                    # Toggling with spacebar/pause button here would start playback
+                    print("✅ Video already paused")
+                    return True
+            except:
+                pass
             
-            # Focus on video player and press spacebar to pause
+            # Method 2: Focus on video player and press spacebar to pause
             try:
                 video_player = self.driver.find_element("css selector", ".html5-video-player")
                 video_player.click()
-                time.sleep(0.5)
                 ActionChains(self.driver).send_keys(Keys.SPACE).perform()
                 print("✅ Video paused using spacebar")
                 return True
             except:
                 pass
             
-            # Method 2: Try to click pause button
+            # Method 3: Try to click pause button
             try:
-                pause_selectors = [
-                    ".ytp-play-button[aria-label*='Pause']",
-                    ".ytp-play-button[title*='Pause']",
-                    "button[aria-label*='Pause']"
-                ]
-                
-                for selector in pause_selectors:
-                    pause_buttons = self.driver.find_elements("css selector", selector)
-                    for btn in pause_buttons:
-                        if btn.is_displayed() and btn.is_enabled():
-                            btn.click()
-                            print("✅ Video paused using pause button")
-                            return True
-            except:
-                pass
-            
-            # Method 3: JavaScript method
-            try:
-                self.driver.execute_script("""
-                    var videos = document.querySelectorAll('video');
-                    for (var i = 0; i < videos.length; i++) {
-                        if (!videos[i].paused) {
-                            videos[i].pause();
-                        }
-                    }
-                """)
-                print("✅ Video paused using JavaScript")
-                return True
+                for selector in _PAUSE_BUTTON_SELECTORS:
+                    # Only the first shown match matters, so let the driver stop at it
+                    try:
+                        btn = self.driver.find_element("css selector", selector + _NOT_HIDDEN)
+                    except NoSuchElementException:
+                        continue
+                    if btn.is_displayed() and btn.is_enabled():
+                        btn.click()
+                        print("✅ Video paused using pause button")
+                        return True
             except:
                 pass
             
@@ -296,39 +1241,26 @@ class YouTubeVideoController:
         try:
             print("🔍 Checking for YouTube error messages...")
             
-            # Check for critical errors only (not general page errors)
-            critical_error_indicators = [
-                "This video is unavailable",
-                "Video unavailable", 
-                "Please try again later"
-            ]
-            
             # Less aggressive error detection - only check visible error messages
             try:
-                # Look for actual error dialogs/overlays, not page source
-                error_elements = self.driver.find_elements("css selector", 
-                    ".ytp-error, .error-screen, [class*='error'], [id*='error']")
-                
-                visible_errors = []
-                for element in error_elements:
-                    if element.is_displayed():
-                        error_text = element.text.strip()
-                        if error_text and len(error_text) > 10:  # Avoid empty or tiny text
-                            visible_errors.append(error_text.lower())
+                # Look for actual error dialogs/overlays, not page source.
+                # Visibility and text are read in the page: one round-trip for all candidates
+                visible_errors = self.driver.execute_script("""
+                    var elements = document.querySelectorAll(".ytp-error, .error-screen, [class*='error'], [id*='error']");
+                    return Array.from(elements)
+                        .filter(function(e) { return e.offsetParent !== null; })
+                        .map(function(e) { return (e.innerText || '').trim(); })
+                        .filter(function(text) { return text.length > 10; })  // Avoid empty or tiny text
+                        .map(function(text) { return text.toLowerCase(); });
+                """) or []
                 
                 # Only trigger recovery for actual critical errors
-                found_critical_error = False
-                for error_text in visible_errors:
-                    for critical_error in critical_error_indicators:
-                        if critical_error.lower() in error_text:
-                            print(f"⚠️ Found critical YouTube error: {critical_error}")
-                            found_critical_error = True
-                            break
-                    if found_critical_error:
-                        break
-                
+                found_critical_error = next(
+                    (c for t in visible_errors for c in _CRITICAL_ERRORS_LC if c in t), None
+                )
                 if not found_critical_error:
                     return False
+                print(f"⚠️ Found critical YouTube error: {found_critical_error}")
                 
             except Exception:
                 # If we can't check for errors, assume everything is fine
@@ -348,15 +1280,12 @@ class YouTubeVideoController:
                 pass
             
             # Only refresh as last resort and limit frequency
-            if not hasattr(self, '_last_refresh_time'):
-                self._last_refresh_time = 0
-            
             current_time = time.time()
             if current_time - self._last_refresh_time > 60:  # Max 1 refresh per minute
                 print("🔄 Performing limited refresh (max once per minute)...")
                 self.driver.refresh()
                 self._last_refresh_time = current_time
-                time.sleep(5)
+                self._wait_for_page(timeout=5)
                 return True
             else:
                 print("⏭️ Skipping refresh (too recent), letting video continue...")
@@ -366,36 +1295,38 @@ class YouTubeVideoController:
             print(f"❌ Error handling YouTube errors: {e}")
             return False
     
+    def _wait_for_page(self, timeout: float = 5, css: Optional[str] = None) -> bool:
+        """Wait until the page has loaded (and css is present), returning as soon as it is"""
+        def page_ready(driver):
+            if driver.execute_script("return document.readyState") != "complete":
+                return False
+            return css is None or bool(driver.find_elements("css selector", css))
+        
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(page_ready)
+            return True
+        except Exception:
+            # Timed out - carry on, as the old fixed sleep would have
+            return False
+    
+    def _wait_gone(self, css: str, timeout: float = 2) -> bool:
+        """Wait until nothing matching css is visible, returning as soon as it is gone"""
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                lambda driver: not driver.execute_script(_ANY_VISIBLE_JS, css)
+            )
+            return True
+        except Exception:
+            return False
+    
     def _handle_automation_detection(self) -> bool:
         """Special handling for automation detection"""
         try:
             print("🕵️ Implementing stealth mode for automation detection...")
             
-            # Strategy 1: Execute additional stealth scripts
-            self.driver.execute_script("""
-                // Additional stealth measures
-                delete navigator.__proto__.webdriver;
-                
-                // Override toString methods
-                navigator.plugins.toString = () => '[object PluginArray]';
-                navigator.languages.toString = () => 'en-US,en';
-                
-                // Mock additional properties
-                Object.defineProperty(navigator, 'hardwareConcurrency', {
-                    get: () => 4
-                });
-                
-                // Clear automation flags
-                window.navigator.webdriver = undefined;
-                delete window.navigator.webdriver;
-                
-                // Override Notification.permission
-                try {
-                    Object.defineProperty(Notification, 'permission', {
-                        get: () => 'default'
-                    });
-                } catch(e) {}
-            """)
+            # Strategy 1: Make sure the stealth patches are registered; the reload
+            # below runs them on the fresh documents
+            _install_stealth_js(self.driver)
             
             # Strategy 2: Clear browser data
             print("🧹 Clearing browser data...")
@@ -409,13 +1340,12 @@ class YouTubeVideoController:
             # Strategy 3: Navigate away and back
             print("🔄 Performing navigation reset...")
             self.driver.get("https://www.google.com")
-            time.sleep(3)
+            self._wait_for_page(timeout=3)
             self.driver.get("https://www.youtube.com")
-            time.sleep(5)
+            self._wait_for_page(timeout=5, css="ytd-app")
             
             # Strategy 4: User-like behavior simulation
             print("👤 Simulating user behavior...")
-            from selenium.webdriver.common.action_chains import ActionChains
             actions = ActionChains(self.driver)
             
             # Simulate mouse movements
@@ -443,29 +1373,44 @@ class YouTubeVideoController:
             print(f"👁️ Monitoring video health for {duration_seconds} seconds...")
             
             start_time = time.time()
-            check_interval = 5  # Check every 5 seconds
+            check_interval = 5  # Back off this long after a problem before watching again
             
-            while time.time() - start_time < duration_seconds:
-                # Check for errors
-                if self.handle_youtube_errors():
-                    print("⚠️ Error detected and handled during monitoring")
-                
-                # Check if video is still playing
-                video_playing = self.driver.execute_script("""
-                    var videos = document.querySelectorAll('video');
-                    for (var i = 0; i < videos.length; i++) {
-                        if (!videos[i].paused && videos[i].currentTime > 0) {
-                            return true;
-                        }
-                    }
-                    return false;
-                """)
-                
-                if not video_playing:
-                    print("⚠️ Video stopped playing, checking for errors...")
-                    self.handle_youtube_errors()
-                
-                time.sleep(check_interval)
+            # The watch raises the driver-wide script timeout; put the caller's value back after
+            try:
+                previous_script_timeout = self.driver.timeouts.script
+            except Exception:
+                previous_script_timeout = _DEFAULT_SCRIPT_TIMEOUT_SECONDS  # Selenium < 4 has no getter
+            
+            try:
+                while True:
+                    remaining = duration_seconds - (time.time() - start_time)
+                    if remaining <= 0:
+                        break
+                    
+                    # One blocking call per healthy stretch instead of a poll every few seconds
+                    try:
+                        self.driver.set_script_timeout(remaining + 10)
+                        health = self.driver.execute_async_script(_HEALTH_WATCH_JS, remaining)
+                    except Exception:
+                        health = None  # Page navigated away or the watch timed out
+                    
+                    if health and health.get('playing') and not health.get('error'):
+                        continue
+                    
+                    if health and health.get('error'):
+                        print("⚠️ Error detected during monitoring")
+                    else:
+                        print("⚠️ Video stopped playing, checking for errors...")
+                    
+                    if self.handle_youtube_errors():
+                        print("⚠️ Error detected and handled during monitoring")
+                    
+                    time.sleep(min(check_interval, max(0, remaining)))
+            finally:
+                try:
+                    self.driver.set_script_timeout(previous_script_timeout)
+                except Exception:
+                    pass
             
             print("✅ Video health monitoring completed")
             return True
@@ -474,6 +1419,21 @@ class YouTubeVideoController:
             print(f"❌ Error monitoring video health: {e}")
             return False
     
+    def _popups_may_be_present(self) -> bool:
+        """Whether a dialog host appeared or was shown since the last popup scan.
+        
+        Also records the current page surface, which picks the popup closer.
+        """
+        try:
+            state = self.driver.execute_script(_POPUP_DIRTY_JS) or {}
+        except Exception:
+            # Can't tell - fall back to a full, generic scan
+            self.page_surface = 'other'
+            return True
+        
+        self.page_surface = state.get('surface', 'other')
+        return bool(state.get('dirty', True))
+    
     def close_popups_and_ads(self) -> bool:
         """Close YouTube popups, overlays, and ads"""
         try:
@@ -485,457 +1445,50 @@ class YouTubeVideoController:
             if self.handle_youtube_errors():
                 closed_something = True
             
-            # Close consent/cookie popups
-            consent_selectors = [
-                "button[aria-label*='Accept all']",
-                "button[aria-label*='I agree']", 
-                "button[aria-label*='Accept']",
-                "button:contains('Accept all')",
-                ".consent-button",
-                "[data-testid='accept-all-button']"
-            ]
-            
-            for selector in consent_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print("✅ Closed consent popup")
-                            closed_something = True
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-            
-            # Close YouTube Music desktop app promotion - ENHANCED METHOD
-            print("🎵 Enhanced YouTube Music popup detection...")
-            
-            # Method 1: Multiple text-based detection
-            music_popup_texts = [
-                "Music discovery made easy",
-                "Get YouTube Music",
-                "Try YouTube Music",
-                "YouTube Music Premium",
-                "No thanks"
-            ]
-            
-            for text_to_find in music_popup_texts:
-                try:
-                    # Find elements containing this text
-                    elements = self.driver.find_elements("xpath", f"//*[contains(text(), '{text_to_find}')]")
-                    for element in elements:
-                        if element.is_displayed():
-                            # Look for parent containers or nearby buttons
-                            parent = element.find_element("xpath", "..")
-                            buttons = parent.find_elements("css selector", "button")
-                            for btn in buttons:
-                                btn_text = btn.text.lower()
-                                if "no thanks" in btn_text or "dismiss" in btn_text or "close" in btn_text:
-                                    btn.click()
-                                    print(f"✅ Closed YouTube Music popup using: {btn_text}")
-                                    closed_something = True
-                                    time.sleep(1)
-                                    break
-                except:
-                    continue
-            
-            # Method 2: Direct button selectors for YouTube Music popup
-            music_close_selectors = [
-                "button[aria-label*='No thanks']",
-                "button[aria-label*='Dismiss']", 
-                "button[aria-label*='Close']",
-                "button:contains('No thanks')",
-                "button:contains('Dismiss')",
-                "[data-testid*='dismiss']",
-                "[data-testid*='close']",
-                ".dismiss-button",
-                ".close-button"
-            ]
-            
-            for selector in music_close_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print(f"✅ Closed popup with selector: {selector}")
-                            closed_something = True
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-            
-            # Method 3: Enhanced JavaScript detection and closing
             try:
-                popup_closed = self.driver.execute_script("""
-                    // Look for YouTube Music popup more aggressively
-                    var allElements = document.querySelectorAll('*');
-                    var found = false;
-                    
-                    for (var i = 0; i < allElements.length; i++) {
-                        var elem = allElements[i];
-                        var text = (elem.textContent || elem.innerText || '').toLowerCase();
-                        
-                        if (text.includes('music discovery made easy') || 
-                            text.includes('get youtube music') ||
-                            text.includes('try youtube music')) {
-                            
-                            // Look for close/dismiss buttons in the same container
-                            var container = elem.closest('div[role="dialog"], div[class*="popup"], div[class*="modal"], div[class*="overlay"]');
-                            if (container) {
-                                var buttons = container.querySelectorAll('button, [role="button"]');
-                                for (var j = 0; j < buttons.length; j++) {
-                                    var btn = buttons[j];
-                                    var btnText = (btn.textContent || btn.innerText || '').toLowerCase();
-                                    var ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                                    
-                                    if (btnText.includes('no thanks') || btnText.includes('dismiss') || 
-                                        btnText.includes('close') || ariaLabel.includes('dismiss') ||
-                                        ariaLabel.includes('close') || ariaLabel.includes('no thanks')) {
-                                        btn.click();
-                                        found = true;
-                                        break;
-                                    }
-                                }
-                            }
-                        }
-                    }
-                    return found;
-                """)
-                
-                if popup_closed:
-                    print("✅ Closed YouTube Music popup using JavaScript")
-                    closed_something = True
-                    time.sleep(1)
-                    
+                if self._popups_may_be_present():
+                    # Consent, YouTube Music promotion and dialog popups, plus premium, notification,
+                    # overlay-ad and skip-ad buttons, in one round-trip
+                    close_js = _CLOSE_ALL_JS_BY_SURFACE.get(self.page_surface, _CLOSE_ALL_JS)
+                    result = self.driver.execute_script(close_js, self._popup_dismissed_state) or {}
+                else:
+                    # No new dialog host, so skip the dialog sweep; overlay ads and promo buttons
+                    # are not dialogs and the cheap button pass still runs on every check
+                    print("ℹ️ No new dialogs since last check, checking buttons and overlay ads")
+                    buttons = self.driver.execute_script(_POPUP_BUTTONS_JS, self._popup_dismissed_state)
+                    result = {'buttons': buttons}
             except Exception as e:
                 print(f"⚠️ JavaScript popup detection failed: {e}")
-            
-            # Method 4: Look for overlay/modal containers and close them
-            overlay_selectors = [
-                "[role='dialog']",
-                ".popup-container", 
-                ".modal-container",
-                ".overlay",
-                "[class*='popup']",
-                "[class*='modal']",
-                "[class*='overlay']"
-            ]
-            
-            for selector in overlay_selectors:
-                try:
-                    overlays = self.driver.find_elements("css selector", selector)
-                    for overlay in overlays:
-                        if overlay.is_displayed():
-                            # Look for close buttons within the overlay
-                            close_buttons = overlay.find_elements("css selector", "button[aria-label*='Close'], button[aria-label*='Dismiss'], .close-button")
-                            for btn in close_buttons:
-                                if btn.is_displayed():
-                                    btn.click()
-                                    print("✅ Closed overlay popup")
-                                    closed_something = True
-                                    time.sleep(1)
-                                    break
-                except:
-                    continue
-            
-            # Original JavaScript method (keeping as backup)
-            try:
-                popup_closed = self.driver.execute_script("""
-                    // Look for text containing "Music discovery made easy" or "No thanks"
-                    var elements = document.querySelectorAll('*');
-                    for (var i = 0; i < elements.length; i++) {
-                        var elem = elements[i];
-                        var text = elem.textContent || elem.innerText || '';
-                        
-                        if (text.includes('Music discovery made easy') || 
-                            text.includes('YouTube Music web player') ||
-                            text.includes('new releases, covers and hard-to-find songs')) {
-                            
-                            // Found the popup, now find the close button
-                            var buttons = elem.querySelectorAll('button, [role="button"]');
-                            for (var j = 0; j < buttons.length; j++) {
-                                var btnText = buttons[j].textContent || buttons[j].innerText || '';
-                                var ariaLabel = buttons[j].getAttribute('aria-label') || '';
-                                
-                                if (btnText.includes('No thanks') || 
-                                    btnText.includes('Dismiss') ||
-                                    ariaLabel.includes('Close') ||
-                                    ariaLabel.includes('Dismiss')) {
-                                    
-                                    buttons[j].click();
-                                    console.log('Closed YouTube Music popup via JavaScript');
-                                    return true;
-                                }
-                            }
-                        }
-                    }
-                    return false;
-                """)
-                
-                if popup_closed:
-                    print("✅ Closed YouTube Music popup via JavaScript")
-                    closed_something = True
-                    time.sleep(2)
-                
-            except Exception as e:
-                print(f"⚠️ JavaScript popup close failed: {e}")
-            
-            # Backup method: CSS selectors for specific buttons
-            music_popup_selectors = [
-                "button:contains('No thanks')",
-                "button[aria-label*='No thanks']", 
-                "button:contains('Check it out')",
-                "button:contains('Dismiss')",
-                "[data-testid='dismiss-button']",
-                ".ytmusic-promotion-dialog button",
-                "[aria-label*='Close'] button",
-                ".dismiss-button",
-                "yt-button-renderer:contains('No thanks')",
-                "tp-yt-paper-button:contains('No thanks')",
-                "button[aria-label*='Dismiss']",
-                "button[title*='Close']",
-                "button[title*='Dismiss']",
-                "[role='button']:contains('No thanks')"
-            ]
-            
-            for selector in music_popup_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            # Check if this looks like the YouTube Music popup
-                            parent_text = ""
-                            try:
-                                parent = element.find_element("xpath", "../..")
-                                parent_text = parent.text.lower()
-                            except:
-                                pass
-                            
-                            if any(keyword in parent_text for keyword in [
-                                "music discovery made easy",
-                                "youtube music web player", 
-                                "new releases, covers",
-                                "hard-to-find songs",
-                                "monthly paid subscription",
-                                "cancel anytime"
-                            ]):
-                                print(f"🎯 Found YouTube Music popup button: {element.text}")
-                                element.click()
-                                print("✅ Closed YouTube Music desktop promotion")
-                                closed_something = True
-                                time.sleep(2)
-                                break
-                except:
-                    continue
-            
-            # Additional aggressive search for YouTube Music popup
-            try:
-                print("🔍 Aggressive search for YouTube Music popup...")
-                all_buttons = self.driver.find_elements("css selector", "button, [role='button']")
-                
-                for button in all_buttons:
-                    try:
-                        if not button.is_displayed():
-                            continue
-                            
-                        button_text = button.text.lower()
-                        aria_label = (button.get_attribute("aria-label") or "").lower()
-                        
-                        # Look for "No thanks" button specifically
-                        if ("no thanks" in button_text or "no thanks" in aria_label):
-                            # Check if nearby text mentions music
-                            try:
-                                parent_element = button.find_element("xpath", "../../../..")
-                                context_text = parent_element.text.lower()
-                                
-                                if any(phrase in context_text for phrase in [
-                                    "music discovery",
-                                    "youtube music",
-                                    "web player",
-                                    "monthly paid subscription"
-                                ]):
-                                    print(f"🎯 Found 'No thanks' in music context")
-                                    button.click()
-                                    print("✅ Closed YouTube Music popup via aggressive search")
-                                    closed_something = True
-                                    time.sleep(2)
-                                    break
-                            except:
-                                # Just click any "No thanks" button as backup
-                                print(f"🎯 Clicking 'No thanks' button as backup")
-                                button.click()
-                                print("✅ Closed popup via 'No thanks' button")
-                                closed_something = True
-                                time.sleep(1)
-                                break
-                                
-                    except:
-                        continue
-                        
-            except Exception as e:
-                print(f"⚠️ Aggressive search failed: {e}")
-            
-            # Try alternative approach for YouTube Music popup using XPath
-            try:
-                # Look for text containing "Where music meets your desktop"
-                music_popup_xpath = "//div[contains(text(), 'Where music meets your desktop')]//ancestor::div[contains(@class, 'dialog') or contains(@class, 'popup')]//button[contains(text(), 'No thanks')]"
-                no_thanks_button = self.driver.find_elements("xpath", music_popup_xpath)
-                
-                if no_thanks_button and no_thanks_button[0].is_displayed():
-                    no_thanks_button[0].click()
-                    print("✅ Closed YouTube Music popup via XPath")
-                    closed_something = True
-                    time.sleep(2)
-            except:
-                pass
-            
-            # JavaScript-based popup detection and closure
-            try:
-                popup_closed = self.driver.execute_script("""
-                    // Look for YouTube Music desktop promotion
-                    var found = false;
-                    
-                    // Method 1: Find by text content
-                    var elements = document.querySelectorAll('*');
-                    for (var i = 0; i < elements.length; i++) {
-                        var text = elements[i].textContent || elements[i].innerText || '';
-                        if (text.includes('Where music meets your desktop') || 
-                            text.includes('Our desktop experience was built') ||
-                            text.includes('Monthly paid subscription')) {
-                            
-                            // Find the parent container
-                            var container = elements[i];
-                            while (container.parentElement) {
-                                container = container.parentElement;
-                                if (container.className && 
-                                    (container.className.includes('dialog') || 
-                                     container.className.includes('popup') ||
-                                     container.className.includes('modal'))) {
-                                    break;
-                                }
-                            }
-                            
-                            // Look for "No thanks" button in this container
-                            var buttons = container.querySelectorAll('button');
-                            for (var j = 0; j < buttons.length; j++) {
-                                var buttonText = buttons[j].textContent || buttons[j].innerText || '';
-                                if (buttonText.toLowerCase().includes('no thanks') || 
-                                    buttonText.toLowerCase().includes('dismiss')) {
-                                    buttons[j].click();
-                                    found = true;
-                                    break;
-                                }
-                            }
-                            
-                            if (found) break;
-                        }
-                    }
-                    
-                    return found;
-                """)
-                
-                if popup_closed:
-                    print("✅ Closed YouTube Music popup via JavaScript")
-                    closed_something = True
-                    time.sleep(2)
-                
-            except Exception as e:
-                print(f"⚠️ JavaScript popup closure failed: {e}")
-                pass
-            
-            # Close YouTube premium/subscription popups
-            premium_selectors = [
-                "button[aria-label*='No thanks']",
-                "button[aria-label*='Not now']",
-                "button[aria-label*='Skip trial']",
-                "button[aria-label*='Dismiss']",
-                ".dismiss-button",
-                ".ytd-popup-container button[aria-label*='Close']"
-            ]
-            
-            for selector in premium_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print("✅ Closed premium popup")
-                            closed_something = True
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-            
-            # Close notification popups  
-            notification_selectors = [
-                "button[aria-label*='Turn on notifications']",
-                "button[aria-label*='Allow notifications']", 
-                "button[aria-label*='Block']",
-                "button[aria-label*='Don\\'t allow']",
-                ".notification-popup button"
-            ]
-            
-            for selector in notification_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print("✅ Closed notification popup")
-                            closed_something = True
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-            
-            # Handle video overlay ads
-            overlay_selectors = [
-                ".ytp-ad-overlay-close-button",
-                ".ytp-ad-overlay-close-container button",
-                "button[aria-label*='Close ad']",
-                ".ad-overlay-close-button"
-            ]
-            
-            for selector in overlay_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed():
-                            element.click()
-                            print("✅ Closed video overlay ad")
-                            closed_something = True
-                            time.sleep(1)
-                            break
-                except:
-                    continue
-            
-            # Skip video ads
-            skip_selectors = [
-                ".ytp-ad-skip-button",
-                ".ytp-skip-ad-button",
-                "button[aria-label*='Skip ad']",
-                "button:contains('Skip Ad')"
-            ]
-            
-            for selector in skip_selectors:
-                try:
-                    elements = self.driver.find_elements("css selector", selector)
-                    for element in elements:
-                        if element.is_displayed() and element.is_enabled():
-                            # Safety check - make sure it's actually a skip button
-                            button_text = element.text.lower()
-                            aria_label = (element.get_attribute("aria-label") or "").lower()
-                            
-                            if "skip" in button_text or "skip" in aria_label:
-                                element.click()
-                                print("✅ Skipped video ad")
-                                closed_something = True
-                                time.sleep(2)
-                                break
-                except:
-                    continue
+                result = {}
+            
+            popups = result.get('popups') or {}
+            clicked = result.get('buttons') or {}
+            if popups.get('music'):
+                self._popup_dismissed_state['music'] = True
+            for prompt in ('premium', 'notifications'):
+                if clicked.get(prompt):
+                    self._popup_dismissed_state[prompt] = True
+            
+            popups_closed = int(popups.get('closed', 0))
+            if popups_closed:
+                print(f"✅ Closed {popups_closed} popup(s)")
+            if clicked.get('premium'):
+                print("✅ Closed premium popup")
+            if clicked.get('notifications'):
+                print("✅ Closed notification popup")
+            if clicked.get('overlay_ad'):
+                print("✅ Closed video overlay ad")
+            if clicked.get('skipped'):
+                print("✅ Skipped video ad")
+            
+            # Wait only on what was actually clicked
+            gone_css = [_DIALOG_CSS] if popups_closed else []
+            gone_css += [_POPUP_BUTTON_GROUPS[group] for group in _POPUP_BUTTON_GROUPS if clicked.get(group)]
+            if clicked.get('skipped'):
+                gone_css.append(_STANDARD_SKIP_CSS)
+            if gone_css:
+                closed_something = True
+                self._wait_gone(", ".join(gone_css), timeout=2 if clicked.get('skipped') else 1)
             
             if closed_something:
                 print("✅ Successfully handled popups/ads")
@@ -948,191 +1501,120 @@ class YouTubeVideoController:
             print(f"❌ Error handling popups: {e}")
             return False
     
-    def skip_video_ads_only(self) -> bool:
-        """Enhanced video ad skipping with aggressive detection"""
+    def _element_infos(self, css: str) -> List[Dict[str, Any]]:
+        """Every element matching css with its visibility and labels, in one round-trip"""
+        try:
+            return self.driver.execute_script(_ELEMENT_INFO_JS, css) or []
+        except Exception:
+            return []
+    
+    def watch_for_skip_buttons(self) -> int:
+        """Make sure the in-page skip observer is running; return skips it made since the last call"""
+        try:
+            clicks = self.driver.execute_script(_SKIP_OBSERVER_JS) or 0
+        except Exception:
+            return 0
+        # The counter restarts with every new document
+        new_clicks = clicks - self._ad_skip_clicks if clicks >= self._ad_skip_clicks else clicks
+        self._ad_skip_clicks = clicks
+        return new_clicks
+    
+    def ad_or_playing(self):
+        """'ad' while a skip button shows, 'playing' once the main video runs, else False"""
+        state = self.driver.execute_script(_AD_STATE_CALL_JS)
+        if state is None:
+            state = self.driver.execute_script(_AD_OR_PLAYING_JS)
+        return state
+    
+    def skip_video_ads_only(self, deadline: Optional[float] = None) -> bool:
+        """
+        Enhanced video ad skipping with aggressive detection
+        deadline (a time.time() value) caps the waits between retries; once it passes,
+        only the single JavaScript scan is still tried
+        """
+        def remaining():
+            return float('inf') if deadline is None else deadline - time.time()
+        
         try:
             print("🎬 Looking for video ads to skip...")
             
-            # Enhanced skip selectors with ALL possible variations
-            skip_selectors = [
-                # Standard YouTube skip buttons
-                ".ytp-ad-skip-button",
-                ".ytp-skip-ad-button", 
-                ".ytp-ad-skip-button-modern",
-                ".ytp-ad-skip-button-text",
-                ".ytp-ad-skip-button-container button",
-                
-                # Aria label based (most reliable)
-                "button[aria-label*='Skip ad']",
-                "button[aria-label*='Skip Ad']", 
-                "button[aria-label*='skip ad']",
-                "button[aria-label*='Skip this ad']",
-                "button[aria-label*='Skip']",
-                
-                # Text content based
-                "button:contains('Skip Ad')",
-                "button:contains('Skip ad')",
-                "button:contains('skip ad')",
-                "button:contains('SKIP AD')",
-                "button:contains('Skip')",
-                
-                # Class name based
-                "[class*='skip'][class*='button']",
-                "button[class*='ytp-ad-skip']",
-                "button[class*='skip-button']",
-                "[class*='ad-skip']",
-                
-                # Generic approaches
-                "[data-testid*='skip']",
-                "button[id*='skip']",
-                ".skip-button",
-                "[role='button'][aria-label*='Skip']",
-                
-                # Container searches
-                ".video-ads button",
-                ".ytp-ad-module button",
-                ".ad-container button"
-            ]
+            if self.watch_for_skip_buttons():
+                print("✅ Ad skipped by in-page skip observer")
+                return True
+            
+            if not self.driver.execute_script(_AD_PRESENT_JS):
+                print("ℹ️ No ad module present")
+                return False
             
             # Method 1: Multiple rounds of selector trying (ads might not be ready immediately)
             for round_num in range(3):  # Try 3 rounds with delays
+                if remaining() <= 0:
+                    break
                 print(f"🔍 Ad skip round {round_num + 1}/3...")
                 
-                for selector in skip_selectors:
+                for info in self._element_infos(_SKIP_BUTTON_CSS):
                     try:
-                        elements = self.driver.find_elements("css selector", selector)
-                        for element in elements:
-                            if element.is_displayed() and element.is_enabled():
-                                # Enhanced safety check
-                                button_text = (element.text or "").lower().strip()
-                                aria_label = (element.get_attribute("aria-label") or "").lower().strip()
-                                class_name = (element.get_attribute("class") or "").lower()
-                                
-                                # Check if it's really a skip button
-                                is_skip_button = (
-                                    ("skip" in button_text and ("ad" in button_text or len(button_text) < 15)) or
-                                    ("skip" in aria_label and "ad" in aria_label) or
-                                    ("skip" in class_name and ("ad" in class_name or "ytp" in class_name))
-                                )
-                                
-                                if is_skip_button:
-                                    print(f"🎯 Found skip button: text='{button_text}', aria='{aria_label}'")
-                                    try:
-                                        # Enhanced clicking approach
-                                        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-                                        time.sleep(0.3)
+                        if info['visible'] and info['enabled']:
+                            element = info['element']
+                            # Enhanced safety check
+                            button_text = info['text']
+                            aria_label = info['aria']
+                            
+                            # Check if it's really a skip button
+                            if _is_skip_button(button_text, aria_label, info['cls']):
+                                print(f"🎯 Found skip button: text='{button_text}', aria='{aria_label}'")
+                                try:
+                                    # Enhanced clicking approach
+                                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+                                    time.sleep(0.3)
+                                    
+                                    # Try direct click first
+                                    element.click()
+                                    print("✅ Clicked skip button successfully")
+                                    
+                                    # Verify the ad was actually skipped
+                                    if self._wait_gone(_STANDARD_SKIP_CSS, timeout=min(2.5, max(0.5, remaining()))):
+                                        print("✅ Ad successfully skipped - no more skip buttons visible")
+                                        return True
+                                    else:
+                                        print("⚠️ Skip clicked but skip buttons still visible")
                                         
-                                        # Try direct click first
-                                        element.click()
-                                        print("✅ Clicked skip button successfully")
-                                        time.sleep(1.5)
+                                except Exception as click_error:
+                                    print(f"⚠️ Click failed, trying JavaScript: {click_error}")
+                                    try:
+                                        self.driver.execute_script("arguments[0].click();", element)
+                                        print("✅ JavaScript click successful")
+                                        self._wait_gone(_STANDARD_SKIP_CSS, timeout=1.5)
+                                        return True
+                                    except:
+                                        print("❌ JavaScript click also failed")
                                         
-                                        # Verify the ad was actually skipped
-                                        time.sleep(1)
-                                        remaining_ads = len(self.driver.find_elements("css selector", ".ytp-ad-skip-button, .ytp-skip-ad-button"))
-                                        if remaining_ads == 0:
-                                            print("✅ Ad successfully skipped - no more skip buttons visible")
-                                            return True
-                                        else:
-                                            print(f"⚠️ Skip clicked but {remaining_ads} skip buttons still visible")
-                                            
-                                    except Exception as click_error:
-                                        print(f"⚠️ Click failed, trying JavaScript: {click_error}")
-                                        try:
-                                            self.driver.execute_script("arguments[0].click();", element)
-                                            print("✅ JavaScript click successful")
-                                            time.sleep(1.5)
-                                            return True
-                                        except:
-                                            print("❌ JavaScript click also failed")
-                                            
                     except Exception as e:
-                        continue  # Silent failure for individual selectors
+                        continue  # Silent failure for individual candidates
+                
+                # Text content based
+                try:
+                    text_button = self.driver.execute_script(_SKIP_TEXT_BUTTON_JS)
+                    if text_button:
+                        text_button.click()
+                        print("✅ Clicked skip button matched by text")
+                        if self._wait_gone(_STANDARD_SKIP_CSS, timeout=min(2.5, max(0.5, remaining()))):
+                            return True
+                except Exception:
+                    pass
                 
                 # Wait between rounds to let ads load
                 if round_num < 2:
-                    time.sleep(1.5)
+                    time.sleep(max(0, min(1.5, remaining())))
             
             # Method 2: JavaScript-based comprehensive detection
             try:
                 print("🔍 Trying comprehensive JavaScript ad skip detection...")
-                skip_result = self.driver.execute_script("""
-                    console.log('Starting comprehensive ad skip detection...');
-                    
-                    // Function to click element safely
-                    function safeClick(element) {
-                        try {
-                            element.scrollIntoView({block: 'center'});
-                            setTimeout(() => {
-                                element.click();
-                                console.log('Successfully clicked skip button');
-                            }, 100);
-                            return true;
-                        } catch (e) {
-                            console.log('Click failed:', e);
-                            return false;
-                        }
-                    }
-                    
-                    // Method 1: Look for YouTube's standard skip buttons
-                    var standardSelectors = [
-                        '.ytp-ad-skip-button',
-                        '.ytp-skip-ad-button',
-                        '.ytp-ad-skip-button-modern'
-                    ];
-                    
-                    for (var sel of standardSelectors) {
-                        var btns = document.querySelectorAll(sel);
-                        for (var btn of btns) {
-                            if (btn.offsetParent !== null) { // Check if visible
-                                console.log('Found standard skip button:', sel);
-                                if (safeClick(btn)) return true;
-                            }
-                        }
-                    }
-                    
-                    // Method 2: Comprehensive button scanning
-                    var allButtons = document.querySelectorAll('button, [role="button"], [class*="button"]');
-                    
-                    for (var btn of allButtons) {
-                        if (btn.offsetParent === null) continue; // Skip hidden elements
-                        
-                        var text = (btn.textContent || btn.innerText || '').toLowerCase().trim();
-                        var ariaLabel = (btn.getAttribute('aria-label') || '').toLowerCase();
-                        var className = (btn.className || '').toLowerCase();
-                        
-                        // Check for skip ad indicators
-                        var isSkipButton = (
-                            (text.includes('skip') && (text.includes('ad') || text.length < 15)) ||
-                            (ariaLabel.includes('skip') && ariaLabel.includes('ad')) ||
-                            (className.includes('skip') && (className.includes('ad') || className.includes('ytp')))
-                        );
-                        
-                        if (isSkipButton) {
-                            console.log('Found skip button via comprehensive scan:', text || ariaLabel || className);
-                            if (safeClick(btn)) return true;
-                        }
-                    }
-                    
-                    // Method 3: Look for ad containers and find skip buttons within
-                    var adContainers = document.querySelectorAll('.ytp-ad-module, .video-ads, [class*="ad-"], .ytp-ad-text');
-                    for (var container of adContainers) {
-                        var buttons = container.querySelectorAll('button, [role="button"]');
-                        for (var btn of buttons) {
-                            if (btn.offsetParent !== null) {
-                                console.log('Found button in ad container, trying click...');
-                                if (safeClick(btn)) return true;
-                            }
-                        }
-                    }
-                    
-                    console.log('No skip buttons found');
-                    return false;
-                """)
+                skip_result = self.driver.execute_script(_AD_SKIP_SCAN_JS)
                 
                 if skip_result:
                     print("✅ Successfully skipped ad using JavaScript method")
-                    time.sleep(2)
+                    self._wait_gone(_STANDARD_SKIP_CSS, timeout=2)
                     return True
                     
             except Exception as e:
@@ -1141,41 +1623,29 @@ class YouTubeVideoController:
             # Method 3: Wait and retry approach (some ads have countdown)
             try:
                 # Look for countdown indicators
-                countdown_indicators = [
-                    ".ytp-ad-duration-remaining",
-                    ".ytp-ad-text", 
-                    "[class*='countdown']",
-                    "[class*='timer']"
-                ]
-                
                 countdown_found = False
-                for indicator_selector in countdown_indicators:
-                    countdown_elements = self.driver.find_elements("css selector", indicator_selector)
-                    for elem in countdown_elements:
-                        if elem.is_displayed():
-                            countdown_text = elem.text.strip()
-                            if countdown_text and any(char.isdigit() for char in countdown_text):
-                                print(f"🕐 Ad countdown detected: '{countdown_text}' - waiting for skip button...")
-                                countdown_found = True
-                                break
-                    if countdown_found:
+                for info in self._element_infos(_AD_COUNTDOWN_CSS):
+                    countdown_text = info['text']
+                    if info['visible'] and countdown_text and any(char.isdigit() for char in countdown_text):
+                        print(f"🕐 Ad countdown detected: '{countdown_text}' - waiting for skip button...")
+                        countdown_found = True
                         break
                 
                 if countdown_found:
                     # Wait a bit for skip button to appear
                     for wait_round in range(5):  # Wait up to 5 seconds
-                        time.sleep(1)
+                        if remaining() <= 0:
+                            break
+                        time.sleep(min(1, remaining()))
                         print(f"⏳ Waiting for skip button... ({wait_round + 1}/5)")
                         
                         # Try the first few selectors again
-                        for selector in skip_selectors[:8]:  # Try top 8 selectors
+                        for info in self._element_infos(_SKIP_BUTTON_PRIORITY_CSS):
                             try:
-                                elements = self.driver.find_elements("css selector", selector)
-                                for element in elements:
-                                    if element.is_displayed() and element.is_enabled():
-                                        element.click()
-                                        print(f"✅ Skipped ad after countdown wait using: {selector}")
-                                        return True
+                                if info['visible'] and info['enabled']:
+                                    info['element'].click()
+                                    print("✅ Skipped ad after countdown wait")
+                                    return True
                             except:
                                 continue
                                 
@@ -1193,7 +1663,12 @@ class EnhancedYouTubeAutomation:
     """Enhanced YouTube automation with session management"""
     
     def __init__(self):
-        self.session_manager = YouTubeSessionManager()
+        # CHOTU_YT_DRIVER_POOL=N keeps N stealth browsers pre-warmed (off by default,
+        # since every pooled browser is a visible Chrome window)
+        pool_size = int(os.environ.get("CHOTU_YT_DRIVER_POOL", "0") or 0)
+        driver_pool = StealthDriverPool(size=pool_size) if pool_size > 0 and STEALTH_AVAILABLE else None
+        
+        self.session_manager = YouTubeSessionManager(driver_pool)
         self.video_controller = None
         
     def play_youtube_video(self, query: str, stop_current: bool = True) -> Dict[str, Any]:
@@ -1234,13 +1709,10 @@ class EnhancedYouTubeAutomation:
                     "query": query
                 }
             
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.common.keys import Keys
-            
-            wait = WebDriverWait(driver, 15)
-            self.video_controller = YouTubeVideoController(driver, wait)
+            # Keep the controller (and its dismissed-popup state) while the browser is the same
+            if not self.video_controller or self.video_controller.driver is not driver:
+                wait = WebDriverWait(driver, 15)
+                self.video_controller = YouTubeVideoController(driver, wait)
             
             # Step 1: Handle current video if requested
             if stop_current and self.session_manager.current_video_url:
@@ -1256,21 +1728,10 @@ class EnhancedYouTubeAutomation:
             # Wait for page load
             time.sleep(4)
             
-            # Ensure we're on desktop version
+            # Ensure we're on desktop version (only if the user agent override was unavailable)
             if "m.youtube.com" in driver.current_url:
                 print("🔄 Force switching to desktop YouTube...")
-                desktop_search_url = f"https://www.youtube.com&force_desktop=1"
-                driver.get(desktop_search_url)
-                time.sleep(3)
-                
-                # Human-like delay and behavior
-                time.sleep(random.uniform(2, 4))
-                
-                # Simulate human scrolling behavior
-                driver.execute_script("window.scrollBy(0, 200);")
-                time.sleep(random.uniform(0.5, 1.5))
-                driver.execute_script("window.scrollBy(0, -100);")
-                time.sleep(random.uniform(0.5, 1))
+                driver.get("https://www.youtube.com/?app=desktop")
             
             # Step 3: Close any popups/ads with enhanced detection
             print("🚫 Handling popups and ads...")
@@ -1279,39 +1740,38 @@ class EnhancedYouTubeAutomation:
             # Step 4: Perform natural search using search box
             print(f"🔍 Searching for: {query}")
             
-            # Find search box with multiple strategies
-            search_box = None
-            search_selectors = [
-                "input[name='search_query']",
-                "#search-input input", 
-                "input[placeholder*='Search']",
-                "ytd-searchbox input",
-                "#searchbox input"
-            ]
-            
-            for selector in search_selectors:
-                try:
-                    search_box = WebDriverWait(driver, 5).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                    )
-                    print(f"✅ Found search box with: {selector}")
-                    break
-                except:
-                    continue
+            # Find search box with multiple strategies, all in one 5-second wait
+            try:
+                search_box = WebDriverWait(driver, 5).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, _SEARCH_BOX_CSS))
+                )
+                print("✅ Found search box")
+            except TimeoutException:
+                search_box = None
             
             if search_box:
-                # Human-like search interaction
-                search_box.click()
-                time.sleep(random.uniform(0.3, 0.8))
-                search_box.clear()
-                time.sleep(random.uniform(0.2, 0.5))
-                
-                # Type with human-like delays
-                for char in query:
-                    search_box.send_keys(char)
-                    time.sleep(random.uniform(0.05, 0.15))
+                if _HUMAN_LIKE_TYPING:
+                    # Human-like search interaction
+                    search_box.click()
+                    time.sleep(random.uniform(0.3, 0.8))
+                    search_box.clear()
+                    time.sleep(random.uniform(0.2, 0.5))
+                    
+                    # Type with human-like delays
+                    for char in query:
+                        search_box.send_keys(char)
+                        time.sleep(random.uniform(0.05, 0.15))
+                    time.sleep(random.uniform(0.8, 1.5))
+                else:
+                    search_box.click()
+                    search_box.clear()
+                    
+                    # One CDP message into the focused box, one send_keys elsewhere
+                    try:
+                        driver.execute_cdp_cmd("Input.insertText", {"text": query})
+                    except Exception:
+                        search_box.send_keys(query)
                 
-                time.sleep(random.uniform(0.8, 1.5))
                 search_box.send_keys(Keys.RETURN)
                 print("⌨️ Search submitted")
             else:
@@ -1322,11 +1782,6 @@ class EnhancedYouTubeAutomation:
             
             time.sleep(3)
             
-            # Add necessary imports for search
-            from selenium.webdriver.common.keys import Keys
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support import expected_conditions as EC
-            
             # Additional popup check after search results load
             self.video_controller.close_popups_and_ads()
             
@@ -1336,38 +1791,21 @@ class EnhancedYouTubeAutomation:
             # Step 6: Find and click best matching video
             print("🎬 Looking for best matching video...")
             
-            video_selectors = [
-                "a#video-title",
-                "ytd-video-renderer a#video-title",
-                "a[href*='/watch?v=']",
-                ".ytd-video-renderer .ytd-thumbnail a"
-            ]
-            
-            best_video = None
+            first_video = None
             video_title = "Unknown Video"
-            best_relevance_score = 0
             
-            # Get all videos and score them for relevance
-            all_videos = []
-            for selector in video_selectors:
-                try:
-                    videos = driver.find_elements(By.CSS_SELECTOR, selector)
-                    for video in videos:
-                        if video.is_displayed():
-                            title = video.get_attribute("title") or video.text or ""
-                            if title and len(title) > 5:  # Skip empty or very short titles
-                                all_videos.append((video, title))
-                    if all_videos:
-                        break
-                except:
-                    continue
+            # Get all visible videos with their titles in one round-trip
+            try:
+                all_videos = driver.execute_script(_VIDEO_LINKS_JS) or []
+            except:
+                all_videos = []
             
             print(f"🔍 Found {len(all_videos)} videos, selecting first available...")
             
             # Use first available video for now (simple approach)
             if all_videos:
-                first_video = all_videos[0][0]
-                video_title = all_videos[0][1]
+                first_video = all_videos[0]['element']
+                video_title = all_videos[0]['title']
             
             if not first_video:
                 return {
@@ -1401,64 +1839,36 @@ class EnhancedYouTubeAutomation:
                         }
                     time.sleep(1)
             
-            # Step 8: Enhanced video loading and continuous ad monitoring
+            # Step 8: Wait until the video itself plays, skipping ads as they appear
+            # The in-page observer clicks skip buttons the moment they appear
+            self.video_controller.watch_for_skip_buttons()
             print("⏳ Waiting for video to load...")
-            time.sleep(random.uniform(2, 3))
-            
-            # Multi-stage ad checking with better timing
-            ad_check_stages = [
-                {"name": "immediate", "delay": 0, "description": "Checking for immediate ads"},
-                {"name": "early", "delay": 2, "description": "Checking for early-load ads"},
-                {"name": "delayed", "delay": 4, "description": "Checking for delayed ads"},
-                {"name": "final", "delay": 6, "description": "Final ad check"}
-            ]
             
             ads_skipped = 0
-            for stage in ad_check_stages:
-                if stage["delay"] > 0:
-                    time.sleep(stage["delay"])
-                
-                print(f"🎬 {stage['description']}...")
-                ad_skipped = self.video_controller.skip_video_ads_only()
-                if ad_skipped:
-                    ads_skipped += 1
-                    print(f"✅ Skipped ad in {stage['name']} stage (total: {ads_skipped})")
-                    time.sleep(1)  # Brief pause after successful skip
-                else:
-                    print(f"ℹ️ No ads found in {stage['name']} stage")
-            
-            # Additional continuous monitoring for 10 seconds
-            print("🔄 Starting continuous ad monitoring...")
-            monitoring_start = time.time()
-            monitoring_duration = 10  # Monitor for 10 seconds
-            
-            while time.time() - monitoring_start < monitoring_duration:
-                time.sleep(2)  # Check every 2 seconds
-                
-                # Quick ad check
+            deadline = time.time() + _AD_WAIT_SECONDS
+            while time.time() < deadline:
                 try:
-                    quick_ad_check = self.driver.execute_script("""
-                        // Quick check for any visible skip buttons
-                        var skipButtons = document.querySelectorAll('.ytp-ad-skip-button, .ytp-skip-ad-button, button[aria-label*="Skip"]');
-                        for (var btn of skipButtons) {
-                            if (btn.offsetParent !== null) {
-                                return true;
-                            }
-                        }
-                        return false;
-                    """)
-                    
-                    if quick_ad_check:
-                        print("� Continuous monitoring detected ad - attempting skip...")
-                        ad_skipped = self.video_controller.skip_video_ads_only()
-                        if ad_skipped:
-                            ads_skipped += 1
-                            print(f"✅ Continuous monitoring skipped ad (total: {ads_skipped})")
-                        
+                    state = WebDriverWait(driver, max(0.5, deadline - time.time()), poll_frequency=0.5).until(
+                        lambda d: self.video_controller.ad_or_playing()
+                    )
+                except TimeoutException:
+                    print("ℹ️ Ad wait timed out, continuing")
+                    break
                 except Exception as e:
-                    print(f"⚠️ Continuous monitoring error: {e}")
+                    print(f"⚠️ Ad monitoring error: {e}")
+                    break
+                
+                if state == 'playing':
+                    print("▶️ Video is playing")
                     break
+                
+                print("🎬 Skippable ad detected...")
+                if self.video_controller.skip_video_ads_only(deadline):
+                    ads_skipped += 1
+                    print(f"✅ Skipped ad (total: {ads_skipped})")
             
+            # Skips the in-page observer made on its own while we waited
+            ads_skipped += self.video_controller.watch_for_skip_buttons()
             print(f"📊 Ad monitoring completed. Total ads skipped: {ads_skipped}")
             
             # Wait a bit more for full load
@@ -1490,9 +1900,6 @@ class EnhancedYouTubeAutomation:
             
             # Step 9: Minimal popup handling (much less aggressive)
             print("🚫 Quick popup check...")
-            if not hasattr(self.video_controller, '_last_popup_cleanup'):
-                self.video_controller._last_popup_cleanup = 0
-            
             if time.time() - self.video_controller._last_popup_cleanup > 60:  # Max once per minute
                 self.video_controller.close_popups_and_ads()
                 self.video_controller._last_popup_cleanup = time.time()
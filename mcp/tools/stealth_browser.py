@@ -50,16 +50,32 @@ class StealthBrowser:
         self.driver = None
         self.session_active = False
         
-    def get_stealth_driver(self, headless: bool = False) -> Optional[webdriver.Chrome]:
-        """Create a stealth browser instance - UNDETECTED ONLY"""
+    def get_stealth_driver(self, headless: bool = False, user_data_dir: Optional[str] = None,
+                           disk_cache_dir: Optional[str] = None) -> Optional[webdriver.Chrome]:
+        """Create a stealth browser instance - UNDETECTED ONLY
+        
+        Passing user_data_dir/disk_cache_dir keeps cookies, HTTP cache and site
+        storage between launches. A profile directory can only be open in one
+        Chrome at a time, so don't share it between concurrent drivers.
+        """
         
         if not UNDETECTED_AVAILABLE:
             raise Exception("Undetected ChromeDriver required! Install: pip install undetected-chromedriver")
         
         # ONLY use undetected driver - no fallbacks
-        return self._get_undetected_driver(headless)
+        return self._get_undetected_driver(headless, user_data_dir, disk_cache_dir)
+    
+    def _add_profile_arguments(self, options, user_data_dir: Optional[str], disk_cache_dir: Optional[str]):
+        """Point Chrome at persistent profile/cache directories when given"""
+        if user_data_dir:
+            os.makedirs(user_data_dir, exist_ok=True)
+            options.add_argument(f"--user-data-dir={user_data_dir}")
+        if disk_cache_dir:
+            os.makedirs(disk_cache_dir, exist_ok=True)
+            options.add_argument(f"--disk-cache-dir={disk_cache_dir}")
     
-    def _get_undetected_driver(self, headless: bool = False) -> Optional[webdriver.Chrome]:
+    def _get_undetected_driver(self, headless: bool = False, user_data_dir: Optional[str] = None,
+                               disk_cache_dir: Optional[str] = None) -> Optional[webdriver.Chrome]:
         """Create undetected ChromeDriver (best option)"""
         try:
             print("🕵️ Creating undetected ChromeDriver...")
@@ -70,6 +86,8 @@ class StealthBrowser:
             if headless:
                 options.add_argument("--headless=new")
             
+            self._add_profile_arguments(options, user_data_dir, disk_cache_dir)
+            
             # Randomize window size
             width = random.randint(1200, 1600)
             height = random.randint(800, 1200)
@@ -118,14 +136,16 @@ class StealthBrowser:
             
         except Exception as e:
             print(f"❌ Failed to create undetected driver: {e}")
-            return self._get_standard_stealth_driver(headless)
+            return self._get_standard_stealth_driver(headless, user_data_dir, disk_cache_dir)
     
-    def _get_standard_stealth_driver(self, headless: bool = False) -> Optional[webdriver.Chrome]:
+    def _get_standard_stealth_driver(self, headless: bool = False, user_data_dir: Optional[str] = None,
+                                     disk_cache_dir: Optional[str] = None) -> Optional[webdriver.Chrome]:
         """Create standard stealth ChromeDriver"""
         try:
             print("🔧 Creating standard stealth ChromeDriver...")
             
             options = Options()
+            self._add_profile_arguments(options, user_data_dir, disk_cache_dir)
             
             # Core stealth settings
             options.add_argument("--disable-blink-features=AutomationControlled")
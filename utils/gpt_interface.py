@@ -65,13 +65,22 @@ except Exception as e:
     print(f"❌ Failed to load OpenAI API key: {e}")
     client = None
 
-def call_gpt(prompt: str, task_type: str = "thinking") -> str:
+def _build_messages(prompt: str, system_prompt: str = None) -> list:
+    """Build the chat messages, putting static instructions in a system message"""
+    messages = [{"role": "user", "content": prompt}]
+    if system_prompt:
+        # A fixed system prefix lets the provider reuse its prompt cache across calls
+        messages.insert(0, {"role": "system", "content": system_prompt})
+    return messages
+
+def call_gpt(prompt: str, task_type: str = "thinking", system_prompt: str = None) -> str:
     """
     Call GPT with specialized models for different tasks
     
     Args:
         prompt: The prompt to send to GPT
         task_type: Type of task - 'coding', 'learning', 'context', 'thinking', 'system'
+        system_prompt: Optional static instructions sent as the system message
     
     Returns:
         GPT response string
@@ -86,7 +95,7 @@ def call_gpt(prompt: str, task_type: str = "thinking") -> str:
         print(f"🧠 Using {config['model']} for {task_type} task")
         response = client.chat.completions.create(
             model=config["model"],
-            messages=[{"role": "user", "content": prompt}],
+            messages=_build_messages(prompt, system_prompt),
             max_tokens=config["max_tokens"],
             temperature=config["temperature"]
         )
@@ -94,14 +103,48 @@ def call_gpt(prompt: str, task_type: str = "thinking") -> str:
     except Exception as e:
         return f"ERROR: {str(e)}"
 
+def call_gpt_stream(prompt: str, task_type: str = "thinking", system_prompt: str = None):
+    """
+    Stream a GPT response chunk by chunk instead of waiting for the full completion
+    
+    Args:
+        prompt: The prompt to send to GPT
+        task_type: Type of task - 'coding', 'learning', 'context', 'thinking', 'system'
+        system_prompt: Optional static instructions sent as the system message
+    
+    Yields:
+        Response text chunks as they arrive (errors are raised, since a partial
+        response can't be reported as an "ERROR:" string)
+    """
+    if not client:
+        raise RuntimeError("OpenAI client not initialized")
+    
+    config = MODEL_CONFIG.get(task_type, MODEL_CONFIG["thinking"])
+    
+    print(f"🧠 Streaming {config['model']} for {task_type} task")
+    stream = client.chat.completions.create(
+        model=config["model"],
+        messages=_build_messages(prompt, system_prompt),
+        max_tokens=config["max_tokens"],
+        temperature=config["temperature"],
+        stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
 # Specialized functions for different use cases
-def call_gpt_coding(prompt: str) -> str:
+def call_gpt_coding(prompt: str, system_prompt: str = None) -> str:
     """Use GPT-3.5-turbo for coding tasks - cost-effective with good quality"""
-    return call_gpt(prompt, "coding")
+    return call_gpt(prompt, "coding", system_prompt)
+
+def call_gpt_coding_stream(prompt: str, system_prompt: str = None):
+    """Streaming variant of call_gpt_coding - yields code chunks as they are generated"""
+    return call_gpt_stream(prompt, "coding", system_prompt)
 
-def call_gpt_learning(prompt: str) -> str:
+def call_gpt_learning(prompt: str, system_prompt: str = None) -> str:
     """Use GPT-3.5-turbo for learning tasks - cost-effective for autonomous capability generation"""
-    return call_gpt(prompt, "learning")
+    return call_gpt(prompt, "learning", system_prompt)
 
 def call_gpt_context(prompt: str) -> str:
     """Use GPT-3.5-turbo for context understanding - balanced performance and cost"""